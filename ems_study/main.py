@@ -1,5 +1,6 @@
 import pandas as pd
 from simulation.optimizer import Optimizer
+from simulation.checkpoint import CheckpointStore
 import numpy as np
 import sys
 import os
@@ -10,6 +11,9 @@ from simulation.controller import EnergyController
 EnergyController = EnergyController()
 
 flag = False
+# Folder for dispatch snapshots, so a re-run after editing the inputs only simulates from the
+# first changed week on (None to always simulate the whole horizon)
+CHECKPOINT_DIR = None
 annual_power_wind_production = windPowerForecast(flag)
 annual_power_pv_production = pvPowerForecast(flag)
 
@@ -31,10 +35,12 @@ if not required_columns.issubset(df.columns):
     raise ValueError(f"Missing columns: {required_columns - set(df.columns)}")
 
 
-df["wind"] = df["wind"] / 1e6  # Convert wind power to kW
 # Run optimization with PV, wind, and load data
-optimizer = Optimizer()
+checkpoint_store = CheckpointStore(CHECKPOINT_DIR) if CHECKPOINT_DIR is not None else None
+optimizer = Optimizer(checkpoint_store=checkpoint_store)
 results = optimizer.run_simulation(df["wind"], df["Load"], df["PV"], df.index.hour)
+if checkpoint_store is not None:
+    print(f"Resumed from step {optimizer.resumed_from} of {len(df)}")
 results['Load'] = df['Load'].values
 results['PV'] = df['PV'].values
 results['wind'] = df['wind'].values
@@ -1,7 +1,13 @@
 import pandas as pd
-from pvlib import pvsystem, modelchain, location
 import sys, os
 from ems_study.config import PV_TILT, PV_AZIMUTH, PV_MODULE, PV_INVERTER, PV_COUNT
+from ems_study.models.pv_orientation import PVOrientationEngine, load_pv_weather, default_location
+from ems_study.simulation.alignment import InputAligner
+
+def pvPowerOutput(engine, pv_count=PV_COUNT, tilt=PV_TILT, azimuth=PV_AZIMUTH):
+    """Power output in W of the project's PV plant, on the weather index of `engine` (a PVOrientationEngine)."""
+    return pd.Series(engine.ac_power([tilt], [azimuth])[:, 0], index=engine.weather.index) * pv_count
+
 
 def pvPowerForecast(flag=True, pv_count=PV_COUNT,
                     tilt=PV_TILT, azimuth=PV_AZIMUTH,
@@ -11,31 +17,14 @@ def pvPowerForecast(flag=True, pv_count=PV_COUNT,
     existing_file_path = r"data/annual_power_input.csv"
 
     # Load weather data
-    weather_raw = pd.read_csv(file_weather_path, index_col=0, parse_dates=True)
-    weather_raw.columns = [col[0] if isinstance(col, tuple) else col for col in weather_raw.columns]
-
-    # Keep only required columns
-    weather_formatted = weather_raw[['ghi', 'dni', 'dhi', 'temp_air', 'wind_speed']]
+    weather_formatted = load_pv_weather(file_weather_path)
 
     # Location object
-    loc = location.Location(latitude=35.0, longitude=1.0, tz='UTC', altitude=100)
+    loc = default_location()
 
-    # Define PV system
-    system = pvsystem.PVSystem(
-        surface_tilt=tilt,
-        surface_azimuth=azimuth,
-        module_parameters=pvsystem.retrieve_sam('CECMod')[module_name],
-        inverter_parameters=pvsystem.retrieve_sam('cecinverter')[inverter_name],
-        racking_model='open_rack',
-        module_type='glass_polymer'
-    )
-
-    # Run model chain
-    mc = modelchain.ModelChain(system, loc, aoi_model='physical', spectral_model='no_loss')
-    mc.run_model(weather_formatted)
-
-    # Get AC power
-    ac_power = mc.results.ac * pv_count
+    # Run the PV model for this orientation
+    engine = PVOrientationEngine(weather_formatted, loc, module_name=module_name, inverter_name=inverter_name)
+    ac_power = pvPowerOutput(engine, pv_count, tilt, azimuth)
     time_step_hours = (ac_power.index[1] - ac_power.index[0]).seconds / 3600
     total_energy_wh = ac_power * time_step_hours
     annual_energy_mwh = total_energy_wh.sum() / 1e6
@@ -53,20 +42,14 @@ def pvPowerForecast(flag=True, pv_count=PV_COUNT,
     # Ensure datetime alignment
     existing_df['Time'] = pd.to_datetime(existing_df['Time'], utc=True)
 
-    # Prepare PV output
-    pv_output_df = ac_power.reset_index()
-    pv_output_df.columns = ['Time', 'PV']
-    pv_output_df['Time'] = pd.to_datetime(pv_output_df['Time'], utc=True)
-
-    # Match lengths
-    min_length = min(len(existing_df), len(pv_output_df))
-    existing_df = existing_df.iloc[:min_length]
-    pv_output_df = pv_output_df.iloc[:min_length]
+    # Map the PV weather-year output onto the load index, W -> MW
+    aligner = InputAligner(existing_df['Time'])
+    pv_output = aligner.align(ac_power, method='linear', source_tz=loc.tz, scale=1e-6)
 
     # Update 'pv' column
     if 'PV' in existing_df.columns:
         existing_df.drop(columns=['PV'], inplace=True)
-    existing_df['PV'] = pv_output_df['PV'].values
+    existing_df['PV'] = pv_output.values
 
     # Save updated CSV
     existing_df.to_csv(existing_file_path, index=False)
@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+from pvlib import pvsystem, location, irradiance, inverter
+import sys, os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from ems_study.config import PV_MODULE, PV_INVERTER, PV_COUNT
+
+
+def load_pv_weather(file_weather_path):
+    """Read the PV weather CSV with the columns pvlib's ModelChain expects."""
+    weather_raw = pd.read_csv(file_weather_path, index_col=0, parse_dates=True)
+    weather_raw.columns = [col[0] if isinstance(col, tuple) else col for col in weather_raw.columns]
+    return weather_raw[['ghi', 'dni', 'dhi', 'temp_air', 'wind_speed']]
+
+
+def default_location():
+    """Site used by pvPowerForecast."""
+    return location.Location(latitude=35.0, longitude=1.0, tz='UTC', altitude=100)
+
+
+class PVOrientationEngine:
+    def __init__(self, weather, loc=None, module_name=PV_MODULE, inverter_name=PV_INVERTER):
+        """
+        Evaluate many (tilt, azimuth) candidates of one PV system on one weather file.
+
+        Follows the pvlib ModelChain used by pvPowerForecast (physical AOI, no spectral loss,
+        Hay-Davies transposition, SAPM cell temperature, CEC single diode, Sandia inverter).
+        Solar position, airmass and extraterrestrial irradiance do not depend on the
+        orientation, so they are computed once; everything downstream is broadcast over
+        a (time x candidate) array.
+
+        Args:
+            weather (pd.DataFrame): ghi, dni, dhi, temp_air and wind_speed columns
+            loc (pvlib.location.Location): Site, defaults to default_location()
+            module_name (str): CEC module name
+            inverter_name (str): CEC inverter name
+        """
+        self.weather = weather
+        self.location = loc if loc is not None else default_location()
+        self.system = pvsystem.PVSystem(
+            module_parameters=pvsystem.retrieve_sam('CECMod')[module_name],
+            inverter_parameters=pvsystem.retrieve_sam('cecinverter')[inverter_name],
+            racking_model='open_rack',
+            module_type='glass_polymer'
+        )
+
+        # -------------------- Orientation-independent geometry --------------------------
+        times = weather.index
+        solar_position = self.location.get_solarposition(times, method='nrel_numpy',
+                                                         temperature=weather['temp_air'])
+        airmass = self.location.get_airmass(solar_position=solar_position, model='kastenyoung1989')
+        self.apparent_zenith = solar_position['apparent_zenith'].to_numpy()[:, None]
+        self.solar_azimuth = solar_position['azimuth'].to_numpy()[:, None]
+        self.airmass = airmass['airmass_relative'].to_numpy()[:, None]
+        self.dni_extra = irradiance.get_extra_radiation(times).to_numpy()[:, None]
+        self.ghi, self.dni, self.dhi, self.temp_air, self.wind_speed = (
+            weather[column].to_numpy(dtype=np.float64)[:, None]
+            for column in ['ghi', 'dni', 'dhi', 'temp_air', 'wind_speed']
+        )
+
+    def ac_power(self, tilts, azimuths):
+        """
+        AC power in W of one system per orientation candidate.
+
+        Args:
+            tilts, azimuths (array-like): Candidate orientations in degrees, same length
+
+        Returns:
+            np.ndarray: AC power, shape (n_steps, n_candidates)
+        """
+        tilt = np.atleast_1d(np.asarray(tilts, dtype=np.float64))[None, :]
+        azimuth = np.atleast_1d(np.asarray(azimuths, dtype=np.float64))[None, :]
+        system = self.system
+        array = system.arrays[0]
+
+        aoi = irradiance.aoi(tilt, azimuth, self.apparent_zenith, self.solar_azimuth)
+        total_irrad = irradiance.get_total_irradiance(
+            tilt, azimuth, self.apparent_zenith, self.solar_azimuth,
+            self.dni, self.ghi, self.dhi,
+            dni_extra=self.dni_extra, airmass=self.airmass, albedo=array.albedo, model='haydavies'
+        )
+        aoi_modifier = system.get_iam(aoi, iam_model='physical')
+        fd = array.module_parameters.get('FD', 1.)
+        effective_irradiance = total_irrad['poa_direct'] * aoi_modifier + fd * total_irrad['poa_diffuse']
+
+        cell_temperature = system.get_cell_temperature(total_irrad['poa_global'], self.temp_air,
+                                                       self.wind_speed, model='sapm')
+
+        # singlediode only takes 1-d inputs, so solve the flattened (time x candidate) grid,
+        # skipping dark points where the module produces nothing anyway
+        shape = np.shape(effective_irradiance)
+        lit = np.asarray(effective_irradiance > 0)
+        params = system.calcparams_cec(effective_irradiance, cell_temperature)
+        dc = pvsystem.singlediode(*(np.broadcast_to(p, shape)[lit] for p in params))
+        v_mp = np.zeros(shape)
+        p_mp = np.zeros(shape)
+        v_mp[lit] = dc['v_mp']
+        p_mp[lit] = dc['p_mp']
+        return inverter.sandia(v_mp, p_mp, system.inverter_parameters)
+
+    def sweep(self, tilts, azimuths, pv_count=PV_COUNT, chunk_size=100):
+        """
+        Annual energy of every (tilt, azimuth) combination of the two candidate lists.
+
+        Candidates are evaluated `chunk_size` at a time to bound memory use.
+
+        Returns:
+            pd.DataFrame: tilt, azimuth and annual_energy_mwh, best orientation first
+        """
+        tilt_grid, azimuth_grid = np.meshgrid(np.atleast_1d(tilts), np.atleast_1d(azimuths), indexing='ij')
+        tilt_grid, azimuth_grid = tilt_grid.ravel(), azimuth_grid.ravel()
+        index = self.weather.index
+        time_step_hours = (index[1] - index[0]).seconds / 3600
+
+        annual_energy_mwh = np.empty(len(tilt_grid))
+        for start in range(0, len(tilt_grid), chunk_size):
+            stop = start + chunk_size
+            ac_power = self.ac_power(tilt_grid[start:stop], azimuth_grid[start:stop]) * pv_count
+            annual_energy_mwh[start:stop] = np.nansum(ac_power, axis=0) * time_step_hours / 1e6
+
+        return pd.DataFrame({
+            'tilt': tilt_grid,
+            'azimuth': azimuth_grid,
+            'annual_energy_mwh': annual_energy_mwh,
+        }).sort_values('annual_energy_mwh', ascending=False, ignore_index=True)
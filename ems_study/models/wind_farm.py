@@ -0,0 +1,182 @@
+import numpy as np
+import pandas as pd
+from windpowerlib import WindTurbine
+import sys, os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+# Power curves loaded from the windpowerlib turbine library, by turbine type
+_POWER_CURVES = {}
+
+
+def load_wind_weather(file_weather_path):
+    """Read the wind weather CSV and format it as a windpowerlib weather DataFrame."""
+    weather_raw = pd.read_csv(file_weather_path, header=[0, 1], index_col=0, parse_dates=True)
+
+    # Rename columns for clarity
+    weather = weather_raw.copy()
+    weather.columns = ['Pressure', 'Temperature_2m', 'WindSpeed_10m', 'RoughnessLength', 'Temperature_80m',
+                       'WindSpeed_80m']
+
+    # Format weather data for Windpowerlib
+    weather_formatted = pd.DataFrame(
+        {
+            ('wind_speed', 10): weather['WindSpeed_10m'],
+            ('temperature', 2): weather['Temperature_2m'],
+            ('pressure', 0): weather['Pressure'],
+            ('roughness_length', 0): weather['RoughnessLength']
+        },
+        index=weather.index
+    )
+    weather_formatted.columns = pd.MultiIndex.from_tuples(weather_formatted.columns)
+    return weather_formatted
+
+
+def power_curve(turbine_type):
+    """Return the (wind_speed, value) power curve of `turbine_type` in m/s and W."""
+    if turbine_type not in _POWER_CURVES:
+        turbine = WindTurbine(hub_height=100, turbine_type=turbine_type)
+        curve = turbine.power_curve
+        _POWER_CURVES[turbine_type] = (curve['wind_speed'].to_numpy(dtype=np.float64),
+                                       curve['value'].to_numpy(dtype=np.float64))
+    return _POWER_CURVES[turbine_type]
+
+
+def stack_power_curves(turbine_types):
+    """
+    Stack power curves into (n_types x n_points) tables.
+
+    Shorter curves are padded by repeating their last point, so every row stays sorted.
+    """
+    curves = [power_curve(turbine_type) for turbine_type in turbine_types]
+    n_points = max(len(speeds) for speeds, _ in curves)
+    speeds = np.empty((len(curves), n_points))
+    values = np.empty((len(curves), n_points))
+    for row, (curve_speeds, curve_values) in enumerate(curves):
+        speeds[row] = np.pad(curve_speeds, (0, n_points - len(curve_speeds)), mode='edge')
+        values[row] = np.pad(curve_values, (0, n_points - len(curve_values)), mode='edge')
+    return speeds, values
+
+
+def interpolate_power_curves(wind_speed, speeds, values):
+    """
+    Evaluate every stacked power curve at every wind speed in one pass.
+
+    Same semantics as windpowerlib.power_output.power_curve without density correction:
+    linear interpolation and zero output outside the curve range.
+
+    Args:
+        wind_speed (np.ndarray): Hub-height wind speeds, shape (n_steps,)
+        speeds, values (np.ndarray): Curve tables from stack_power_curves, shape (n_types, n_points)
+
+    Returns:
+        np.ndarray: Power output in W, shape (n_types, n_steps)
+    """
+    n_types, n_points = speeds.shape
+    u = np.asarray(wind_speed, dtype=np.float64)
+
+    # Offset every row into its own disjoint range so one searchsorted covers the whole table
+    span = max(speeds.max(), np.nanmax(u) if u.size else 0.0, 0.0) - min(speeds.min(), 0.0) + 1.0
+    offsets = np.arange(n_types)[:, None] * span
+    flat_speeds = (speeds + offsets).ravel()
+    position = np.searchsorted(flat_speeds, (u[None, :] + offsets).ravel(), side='right').reshape(n_types, -1)
+    position -= np.arange(n_types)[:, None] * n_points
+
+    hi = np.clip(position, 1, n_points - 1)
+    lo = hi - 1
+    rows = np.arange(n_types)[:, None]
+    v_lo, v_hi = speeds[rows, lo], speeds[rows, hi]
+    p_lo, p_hi = values[rows, lo], values[rows, hi]
+    gap = v_hi - v_lo
+    slope = np.divide(p_hi - p_lo, gap, out=np.zeros_like(gap), where=gap > 0)
+    power = p_lo + (u[None, :] - v_lo) * slope
+
+    v_min, v_max = speeds[:, :1], speeds[:, -1:]
+    power = np.where(u[None, :] == v_max, values[:, -1:], power)
+    power = np.where((u[None, :] < v_min) | (u[None, :] > v_max), 0.0, power)
+    return np.where(np.isnan(u[None, :]), np.nan, power)
+
+
+def _closest_height(weather, variable, hub_height):
+    heights = weather[variable].columns
+    return heights[np.argmin(np.abs(np.asarray(heights, dtype=np.float64) - hub_height))]
+
+
+class WindFarmEngine:
+    def __init__(self, weather):
+        """
+        Evaluate mixed wind fleets on one weather data set.
+
+        Hub-height wind speed (logarithmic profile), temperature (linear gradient) and density
+        (ideal gas) only depend on the hub height, so they are computed once per distinct
+        height and shared by every turbine type mounted at that height.
+
+        Args:
+            weather (pd.DataFrame): windpowerlib-style weather with (variable, height) columns
+        """
+        self.weather = weather
+        self._hub_conditions = {}
+
+    def hub_conditions(self, hub_height):
+        """Return wind_speed (m/s), temperature (K) and density (kg/m³) at `hub_height`."""
+        if hub_height in self._hub_conditions:
+            return self._hub_conditions[hub_height]
+        weather = self.weather
+
+        if hub_height in weather['wind_speed'].columns:
+            wind_speed = weather['wind_speed'][hub_height]
+        else:
+            height = _closest_height(weather, 'wind_speed', hub_height)
+            roughness = weather['roughness_length'].iloc[:, 0]
+            wind_speed = (weather['wind_speed'][height] * np.log(hub_height / roughness)
+                          / np.log(height / roughness))
+
+        if hub_height in weather['temperature'].columns:
+            temperature = weather['temperature'][hub_height]
+        else:
+            height = _closest_height(weather, 'temperature', hub_height)
+            temperature = weather['temperature'][height] - 0.0065 * (hub_height - height)
+
+        height = _closest_height(weather, 'pressure', hub_height)
+        density = ((weather['pressure'][height] / 100 - (hub_height - height) * 1 / 8)
+                   * 100 / (287.058 * temperature))
+
+        conditions = pd.DataFrame(
+            {'wind_speed': wind_speed.to_numpy(), 'temperature': temperature.to_numpy(),
+             'density': density.to_numpy()},
+            index=weather.index,
+        )
+        self._hub_conditions[hub_height] = conditions
+        return conditions
+
+    def turbine_power(self, turbine_types, hub_height):
+        """Power output in W of one turbine of each type at `hub_height` (one column per type)."""
+        turbine_types = list(dict.fromkeys(turbine_types))
+        speeds, values = stack_power_curves(turbine_types)
+        wind_speed = self.hub_conditions(hub_height)['wind_speed'].to_numpy()
+        power = interpolate_power_curves(wind_speed, speeds, values)
+        return pd.DataFrame(power.T, index=self.weather.index, columns=turbine_types)
+
+    def power_output(self, wind_farm_config):
+        """
+        Power output in W of every fleet entry (one column per entry, scaled by its count).
+
+        Args:
+            wind_farm_config (list): Dicts with 'turbine_type', 'hub_height' and 'count'
+        """
+        columns = {}
+        by_height = {}
+        for position, entry in enumerate(wind_farm_config):
+            by_height.setdefault(entry['hub_height'], []).append(position)
+
+        for hub_height, positions in by_height.items():
+            per_turbine = self.turbine_power([wind_farm_config[p]['turbine_type'] for p in positions], hub_height)
+            for p in positions:
+                entry = wind_farm_config[p]
+                columns[p] = per_turbine[entry['turbine_type']].to_numpy() * entry['count']
+
+        return pd.DataFrame(
+            np.column_stack([columns[p] for p in range(len(wind_farm_config))]),
+            index=self.weather.index,
+            columns=[f"{entry['turbine_type']}@{entry['hub_height']}m" for entry in wind_farm_config],
+        )
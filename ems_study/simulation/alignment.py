@@ -0,0 +1,160 @@
+# simulation/alignment.py
+import hashlib
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+# Length of the profile used when a source is year-shifted onto the target horizon.
+# In a leap target year every timestamp from Feb 29 on maps one day later in the profile
+# (Feb 29 reads Mar 1) and Dec 31 wraps to Jan 1. Samples of a leap source year at or
+# beyond this length (its Dec 31) are dropped.
+YEAR_NS = np.int64(365 * 24 * 3600 * 10**9)
+
+# Resampling plans shared by every aligner (and therefore every scenario of a sweep)
+_PLAN_CACHE = {}
+_PLAN_CACHE_MAX_ENTRIES = 64
+
+
+def _to_datetime_index(index, tz, source_tz="UTC"):
+    """Return a tz-aware DatetimeIndex expressed in `tz`; naive stamps are read as `source_tz`."""
+    try:
+        index = pd.DatetimeIndex(pd.to_datetime(index))
+    except (TypeError, ValueError):
+        # Mixed UTC offsets (e.g. DST changes in the wind weather file)
+        index = pd.DatetimeIndex(pd.to_datetime(index, utc=True))
+    if index.tz is None:
+        index = index.tz_localize(source_tz)
+    return index.tz_convert(tz).as_unit("ns")
+
+
+def _index_key(index):
+    """Cheap content fingerprint of a DatetimeIndex (used as a plan cache key)."""
+    stamps = np.ascontiguousarray(index.asi8)
+    return len(stamps), hashlib.sha1(stamps.tobytes()).hexdigest()
+
+
+def _positions(index, year_shift):
+    """Positions in ns: elapsed time inside the calendar year, or absolute epoch time."""
+    stamps = index.asi8
+    if not year_shift:
+        return stamps
+    naive = index.tz_localize(None)
+    year_start = pd.DatetimeIndex(naive.to_period("Y").start_time).as_unit("ns")
+    return naive.asi8 - year_start.asi8
+
+
+def _build_plan(source_pos, target_pos, period):
+    """
+    Bracketing source samples and linear weights for every target position.
+
+    Returns (lo, hi, weight) so that a resampled value is
+    values[lo] * (1 - weight) + values[hi] * weight, and values[lo] for step resampling.
+    """
+    if period is not None:
+        # Keep the profile inside [0, period) so the wrapped samples below stay sorted
+        inside = np.flatnonzero(source_pos < period)
+        if len(inside) < 2:
+            raise ValueError("At least two source samples are required for alignment.")
+        order = inside[np.argsort(source_pos[inside], kind="stable")]
+    else:
+        order = np.argsort(source_pos, kind="stable")
+    xs = source_pos[order].astype(np.float64)
+
+    if period is not None:
+        # Treat the source as one periodic profile: wrap both ends so the last sample
+        # interpolates towards the first one of the next cycle.
+        target = np.mod(target_pos, period).astype(np.float64)
+        xs = np.concatenate(([xs[-1] - period], xs, [xs[0] + period]))
+        order = np.concatenate(([order[-1]], order, [order[0]]))
+    else:
+        # Outside the source horizon hold the edge values
+        target = np.clip(target_pos, xs[0], xs[-1]).astype(np.float64)
+
+    hi = np.searchsorted(xs, target, side="right")
+    hi = np.clip(hi, 1, len(xs) - 1)
+    lo = hi - 1
+
+    span = xs[hi] - xs[lo]
+    weight = np.divide(target - xs[lo], span, out=np.zeros_like(target), where=span > 0)
+    weight = np.clip(weight, 0.0, 1.0)
+
+    return order[lo], order[hi], weight
+
+
+class InputAligner:
+    def __init__(self, target_index, tz="UTC", target_tz="UTC"):
+        """
+        Map time series of any resolution, year and timezone onto one target index.
+
+        Args:
+            target_index: Timestamps of the simulation horizon (e.g. the 15-minute load index)
+            tz (str): Timezone every source is normalized to before alignment
+            target_tz (str): Timezone assumed for naive target timestamps
+        """
+        self.tz = tz
+        self.index = _to_datetime_index(target_index, tz, target_tz)
+        self._key = _index_key(self.index)
+        self._positions = {}
+
+    def _target_positions(self, year_shift):
+        if year_shift not in self._positions:
+            self._positions[year_shift] = _positions(self.index, year_shift)
+        return self._positions[year_shift]
+
+    def plan(self, source_index, source_tz="UTC", year_shift=True):
+        """Return the cached (lo, hi, weight) resampling plan for `source_index`."""
+        source_index = _to_datetime_index(source_index, self.tz, source_tz)
+        key = (_index_key(source_index), self._key, year_shift)
+
+        plan = _PLAN_CACHE.get(key)
+        if plan is None:
+            if len(source_index) < 2:
+                raise ValueError("At least two source samples are required for alignment.")
+            period = YEAR_NS if year_shift else None
+            plan = _build_plan(_positions(source_index, year_shift), self._target_positions(year_shift), period)
+            if len(_PLAN_CACHE) >= _PLAN_CACHE_MAX_ENTRIES:
+                _PLAN_CACHE.pop(next(iter(_PLAN_CACHE)))
+            _PLAN_CACHE[key] = plan
+        return plan
+
+    def align(self, series, method="linear", source_tz="UTC", year_shift=True, scale=1.0):
+        """
+        Resample `series` onto the target index.
+
+        Args:
+            series (pd.Series): Source values indexed by timestamps
+            method (str): 'linear' for power values, 'step' for piecewise-constant inputs (tariffs)
+            source_tz (str): Timezone of naive source timestamps
+            year_shift (bool): Align by position in the calendar year instead of absolute time
+            scale (float): Unit conversion applied to the values (e.g. 1e-6 for W -> MW)
+
+        Returns:
+            pd.Series: Values on the target index
+        """
+        if method not in ("linear", "step"):
+            raise ValueError(f"Unknown alignment method: {method}")
+
+        lo, hi, weight = self.plan(series.index, source_tz=source_tz, year_shift=year_shift)
+        values = np.asarray(series, dtype=np.float64)
+
+        if method == "step":
+            aligned = values[lo]
+        else:
+            aligned = values[lo] * (1.0 - weight) + values[hi] * weight
+
+        return pd.Series(aligned * scale, index=self.index, name=series.name)
+
+    def align_frame(self, df, methods=None, source_tz="UTC", year_shift=True, scales=None):
+        """Align every column of `df`; `methods` and `scales` are optional per-column dicts."""
+        methods = methods or {}
+        scales = scales or {}
+        aligned = {
+            column: self.align(df[column], method=methods.get(column, "linear"), source_tz=source_tz,
+                               year_shift=year_shift, scale=scales.get(column, 1.0))
+            for column in df.columns
+        }
+        return pd.DataFrame(aligned, index=self.index)
@@ -0,0 +1,124 @@
+# simulation/checkpoint.py
+import hashlib
+import pickle
+from collections import OrderedDict
+import sys
+import os
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+# One week of 15-minute steps between snapshots
+DEFAULT_SNAPSHOT_INTERVAL = 96 * 7
+
+# About twenty full-year runs of weekly snapshots
+DEFAULT_MAX_SNAPSHOTS = 1000
+
+
+def block_keys(arrays, n_steps, interval, seed):
+    """
+    Chained hashes of the inputs, one per block of `interval` steps.
+
+    The key of block b covers `seed` and every input value up to the end of block b,
+    so two runs share the key of block b only if their inputs agree on that whole prefix.
+    """
+    arrays = [np.ascontiguousarray(a) for a in arrays]
+    keys = []
+    previous = hashlib.sha256(repr(seed).encode()).hexdigest()
+    for start in range(0, n_steps, interval):
+        h = hashlib.sha256(previous.encode())
+        for a in arrays:
+            h.update(a[start:start + interval].tobytes())
+        previous = h.hexdigest()
+        keys.append(previous)
+    return keys
+
+
+class CheckpointStore:
+    def __init__(self, directory=None, max_entries=DEFAULT_MAX_SNAPSHOTS, max_bytes=None):
+        """
+        Snapshots of controller state and block results, keyed by block_keys() hashes.
+
+        Keys are chained, so every edit to the inputs adds a new snapshot for each block from
+        the change to the end. Least recently used snapshots are evicted beyond the limits.
+
+        Args:
+            directory (str): Folder for persistent snapshots; kept in memory when None.
+                             With a folder, snapshots are only read from disk (no memory copy)
+            max_entries (int): Maximum number of snapshots, None for unlimited
+            max_bytes (int): Maximum total size of the snapshot files, None for unlimited
+                             (only applies with a directory)
+        """
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def get(self, key):
+        """Return {'state': ..., 'results': DataFrame} for `key`, or None."""
+        if self.directory is None:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+            os.utime(path)  # Mark as recently used for eviction
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            # Missing, truncated, or pickled by a version whose classes no longer load
+            return None
+        return entry
+
+    def put(self, key, state, results):
+        entry = {"state": dict(state), "results": results}
+        if self.directory is None:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while self.max_entries is not None and len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return
+
+        # Write then rename so a crashed run never leaves a truncated snapshot behind
+        tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._path(key))
+        self._evict()
+
+    def _evict(self):
+        """Delete least recently used snapshot files until both limits hold."""
+        if self.max_entries is None and self.max_bytes is None:
+            return
+        files = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".pkl"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:  # Evicted by another process meanwhile
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        files.sort()
+        count, total = len(files), sum(size for _, size, _ in files)
+        for _, size, path in files:
+            over_entries = self.max_entries is not None and count > self.max_entries
+            over_bytes = self.max_bytes is not None and total > self.max_bytes
+            if not (over_entries or over_bytes):
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            count -= 1
+            total -= size
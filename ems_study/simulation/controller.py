@@ -9,6 +9,12 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.
 from ems_study.models.battery import BatterySystem  # Now it should work
 from ems_study.config import BATTERY_CAPACITY_MWh
 
+# Bump whenever the dispatch rules change, so cached snapshots and results are invalidated
+CONTROLLER_VERSION = "1"
+
+# Hours of the day treated as peak tariff hours
+PEAK_HOURS = [19, 20, 21, 22, 23, 0, 11, 12, 18]
+
 
 class EnergyController:
     def __init__(self, capacity=BATTERY_CAPACITY_MWh):
@@ -141,6 +147,13 @@ class EnergyController:
             "load_demand_peakhour": load_demand_peakhour
         }
 
+    def get_state(self):
+        """Return the controller state needed to resume a dispatch run."""
+        return {"energy_stored": self.battery.energy_stored}
+
+    def set_state(self, state):
+        """Restore a state returned by get_state()."""
+        self.battery.energy_stored = state["energy_stored"]
+
     def peackHour(self, time):
-        hours = [19, 20, 21, 22, 23, 0, 11, 12, 18]
-        return int(time) in hours
+        return int(time) in PEAK_HOURS
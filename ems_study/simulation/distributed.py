@@ -0,0 +1,161 @@
+# simulation/distributed.py
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import traceback
+from pprint import pprint
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from job_queue import SQLiteJobQueue, PENDING, LEASED
+from scenario import run_simulation, check_overrides
+
+DEFAULT_QUEUE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'results', 'sweep_jobs.sqlite'))
+
+
+def scenario_descriptors(wind_candidates, battery_candidates, overrides=None):
+    """One descriptor per (turbine count x battery capacity) point, as accepted by run_simulation."""
+    return [
+        {"num_wind_turbines": wind, "storage_capacity_mwh": capacity, "overrides": overrides or {}}
+        for wind in wind_candidates
+        for capacity in battery_candidates
+    ]
+
+
+def publish_sweep(queue, sweep_id, wind_candidates, battery_candidates, overrides=None):
+    """Publish every point of a sizing sweep; returns the number of new jobs."""
+    check_overrides(overrides)
+    return queue.publish(sweep_id, scenario_descriptors(wind_candidates, battery_candidates, overrides))
+
+
+def wait_for_sweep(queue, sweep_id, poll_interval=5, timeout=None):
+    """
+    Block until no job of the sweep is pending or leased.
+
+    Returns:
+        list: Metric dicts of the completed jobs, in publication order
+    """
+    deadline = None if timeout is None else time.time() + timeout
+    while True:
+        counts = queue.counts(sweep_id)
+        if counts[PENDING] == 0 and counts[LEASED] == 0:
+            return queue.results(sweep_id)
+        if deadline is not None and time.time() > deadline:
+            raise TimeoutError(f"Sweep {sweep_id} still running: {counts}")
+        time.sleep(poll_interval)
+
+
+def _default_simulate(**descriptor):
+    return run_simulation(output_path=None, **descriptor)
+
+
+def run_worker(queue, worker_id=None, simulate=None, sweep_id=None, poll_interval=5, idle_timeout=None):
+    """
+    Pull scenarios from the queue, run them and push their metrics back.
+
+    Inputs (load, PV, weather) are read from the worker's own data directory and kept in
+    memory between jobs. While a job runs, a background thread renews its lease, so only
+    a lost worker lets the lease expire and the job be retried elsewhere.
+
+    Args:
+        queue: SQLiteJobQueue or any backend with the same methods and lease_seconds
+        worker_id (str): Name recorded on claimed jobs, defaults to host:pid
+        simulate (callable): simulate(**descriptor) -> metrics dict, defaults to run_simulation
+        sweep_id (str): Only take jobs of this sweep, None for any
+        poll_interval (float): Seconds between polls of an empty queue
+        idle_timeout (float): Stop after this many idle seconds, None to run forever
+
+    Returns:
+        int: Number of jobs completed
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    simulate = simulate or _default_simulate
+    heartbeat_interval = queue.lease_seconds / 3
+    completed = 0
+    idle_since = time.time()
+
+    while True:
+        job = queue.claim(worker_id, sweep_id=sweep_id)
+        if job is None:
+            if idle_timeout is not None and time.time() - idle_since > idle_timeout:
+                return completed
+            time.sleep(poll_interval)
+            continue
+
+        stop = threading.Event()
+
+        def renew_lease(job_id=job["id"]):
+            while not stop.wait(heartbeat_interval):
+                if not queue.heartbeat(job_id, worker_id):
+                    return
+
+        heartbeat = threading.Thread(target=renew_lease, daemon=True)
+        heartbeat.start()
+        try:
+            metrics = simulate(**job["descriptor"])
+        except Exception:
+            stop.set()
+            heartbeat.join()
+            queue.fail(job["id"], worker_id, traceback.format_exc())
+        else:
+            stop.set()
+            heartbeat.join()
+            if queue.complete(job["id"], worker_id, metrics):
+                completed += 1
+        idle_since = time.time()
+
+
+def _candidates(spec):
+    # "0:81:20" -> range(0, 81, 20), "10,20,50" -> [10, 20, 50]
+    if ":" in spec:
+        return list(range(*(int(part) for part in spec.split(":"))))
+    return [float(value) if "." in value else int(value) for value in spec.split(",")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a sizing sweep on workers sharing a job queue.")
+    parser.add_argument("--queue", default=DEFAULT_QUEUE_PATH, help="SQLite job queue file")
+    parser.add_argument("--lease", type=float, default=600, help="Lease duration in seconds")
+    parser.add_argument("--max-attempts", type=int, default=3)
+    parser.add_argument("--no-wal", action="store_true", help="Needed when the queue is on a network mount")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    coordinator = commands.add_parser("coordinator", help="Publish a sweep and collect its results")
+    coordinator.add_argument("sweep", help="Sweep name")
+    coordinator.add_argument("--wind", default="0:81:20", help="Turbine counts, start:stop:step or a,b,c")
+    coordinator.add_argument("--battery", default="0:100:20", help="Capacities in MWh, start:stop:step or a,b,c")
+    coordinator.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                             help="Config override, VALUE parsed as JSON (repeatable)")
+    coordinator.add_argument("--no-wait", action="store_true", help="Publish only")
+
+    worker = commands.add_parser("worker", help="Run jobs until interrupted")
+    worker.add_argument("--sweep", default=None, help="Only take jobs of this sweep")
+    worker.add_argument("--idle-timeout", type=float, default=None, help="Exit after this many idle seconds")
+
+    args = parser.parse_args()
+    queue = SQLiteJobQueue(args.queue, lease_seconds=args.lease, max_attempts=args.max_attempts, wal=not args.no_wal)
+
+    if args.command == "coordinator":
+        overrides = {}
+        for assignment in args.set:
+            name, value = assignment.split("=", 1)
+            try:
+                overrides[name] = json.loads(value)
+            except json.JSONDecodeError:
+                overrides[name] = value
+        try:
+            check_overrides(overrides)
+        except ValueError as error:
+            parser.error(str(error))
+        added = publish_sweep(queue, args.sweep, _candidates(args.wind), _candidates(args.battery), overrides)
+        print(f"Published {added} new jobs to sweep {args.sweep}")
+        if not args.no_wait:
+            pprint(wait_for_sweep(queue, args.sweep))
+            for descriptor, error in queue.errors(args.sweep):
+                print(f"Failed: {descriptor}\n{error}")
+    else:
+        print(f"Completed {run_worker(queue, sweep_id=args.sweep, idle_timeout=args.idle_timeout)} jobs")
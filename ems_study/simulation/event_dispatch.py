@@ -0,0 +1,193 @@
+# simulation/event_dispatch.py
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from ems_study.simulation.controller import PEAK_HOURS
+
+# First look-ahead window (one day of 15-minute steps); doubled while no event is found
+_INITIAL_WINDOW = 96
+
+_SOURCES = ["pv", "wind", "storage", "grid"]
+
+
+def _port_labels(pv_to_load, wind_to_load, storage_to_load, grid_to_load, system_to_grid, is_peak):
+    """Vectorized version of the human-readable 'port' label of manage_energy."""
+    code = ((pv_to_load > 0).astype(int) + 2 * (wind_to_load > 0) + 4 * (storage_to_load > 0)
+            + 8 * (grid_to_load > 0))
+    table = np.array(["idle"] + [" + ".join(name for bit, name in enumerate(_SOURCES) if c >> bit & 1)
+                                 for c in range(1, 16)], dtype=object)
+    used = table[code]
+    used[(code == 0) & (system_to_grid > 0)] = "export only"
+    mode = np.where(is_peak, " [peak]", " [off-peak]").astype(object)
+    return used + mode
+
+
+def _energy_trajectory(energy, capacity, charge_energy, discharge_energy, deficit_peak):
+    """
+    Battery energy after every step, advancing span by span between regime changes.
+
+    Regimes: battery full (stays full until the next peak discharge), gate open (SoC > 20%,
+    energy moves linearly with charges and peak discharges) and gate closed (SoC <= 20%,
+    only charges move it). A span ends at the next event: the battery fills up, runs empty,
+    or the 20% gate opens/closes before a peak deficit step. Each span is filled with one
+    cumulative sum, which adds the steps in the same order as the step-by-step loop.
+
+    Returns:
+        (np.ndarray, np.ndarray): energy after each step, and whether the discharge gate was open
+    """
+    n_steps = len(charge_energy)
+    after = np.empty(n_steps)
+    gate_open = np.zeros(n_steps, dtype=bool)
+
+    t = 0
+    window = _INITIAL_WINDOW
+    while t < n_steps:
+        stop = min(t + window, n_steps)
+
+        if energy == capacity and (energy / capacity) * 100 > 20:
+            # Full: charges are clipped away until the next peak discharge
+            discharges = np.flatnonzero(deficit_peak[t:stop])
+            end = t + discharges[0] if discharges.size else stop
+            after[t:end] = energy
+            if end == t:
+                # Discharge out of the full state, then continue in the gate-open regime
+                gate_open[t] = True
+                energy = max(energy - discharge_energy[t], 0)
+                after[t] = energy
+                end = t + 1
+            t = end
+            window = _INITIAL_WINDOW if end < stop else window * 2
+            continue
+
+        is_open = (energy / capacity) * 100 > 20
+        # Charge and discharge steps are exclusive, so each step adds exactly one of them
+        step = charge_energy[t:stop] - (discharge_energy[t:stop] if is_open else 0.0)
+        cum = np.cumsum(np.concatenate(([energy], step)))
+        before, span_after = cum[:-1], cum[1:]
+
+        # Events inside the window: the step that must be clipped, or the gate flipping
+        soc_before = (before / capacity) * 100
+        gate_flips = deficit_peak[t:stop] & ((soc_before > 20) != is_open)
+        clipped = (span_after > capacity) | (span_after < 0)
+        events = np.flatnonzero(gate_flips | clipped)
+
+        if events.size == 0:
+            after[t:stop] = span_after
+            gate_open[t:stop] = is_open & deficit_peak[t:stop]
+            energy = span_after[-1]
+            t = stop
+            window *= 2
+            continue
+
+        k = events[0]
+        after[t:t + k] = span_after[:k]
+        gate_open[t:t + k] = is_open & deficit_peak[t:t + k]
+        energy = before[k]
+        t += k
+        window = _INITIAL_WINDOW
+        if gate_flips[k]:
+            continue  # re-evaluate step t in the other regime
+
+        # Clipped step, applied exactly like BatterySystem.charge/discharge
+        if charge_energy[t] > 0:
+            energy = min(energy + charge_energy[t], capacity)
+        elif is_open and deficit_peak[t]:
+            gate_open[t] = True
+            energy = max(energy - discharge_energy[t], 0)
+        after[t] = energy
+        t += 1
+
+    return after, gate_open
+
+
+def run_event_driven(controller, wind, load, pv, time, time_m=15):
+    """
+    Event-driven equivalent of running controller.manage_energy over every step.
+
+    Every flow that does not depend on the battery state is computed for the whole horizon
+    at once; only the battery energy is advanced sequentially, one regime span at a time.
+    The controller's battery is left in its final state, as after the step-by-step loop.
+
+    Returns:
+        pd.DataFrame: Same columns and values as Optimizer.run_simulation
+    """
+    wind = np.asarray(wind, dtype=np.float64)
+    load = np.asarray(load, dtype=np.float64)
+    pv = np.asarray(pv, dtype=np.float64)
+    time = np.asarray(time)
+    battery = controller.battery
+    nominal = getattr(battery, "nominal_power", 0.0)
+    eff = getattr(battery, "efficiency", 1.0)
+    capacity = battery.capacity
+    is_peak = np.isin(time.astype(int), PEAK_HOURS)
+
+    # -------------------- Step 1: Serve load from PV then Wind -----------------------
+    pv_to_load = np.minimum(pv, load)
+    remaining = load - pv_to_load
+    pv_remain = pv - pv_to_load
+    wind_to_load = np.minimum(wind, remaining)
+    remaining = remaining - wind_to_load
+    wind_remain = wind - wind_to_load
+
+    # -------------------- Step 3: Surplus handling (state independent) --------------
+    total_surplus = pv_remain + wind_remain
+    has_surplus = total_surplus > 0
+    charge_power = np.where(has_surplus, np.minimum(total_surplus, nominal), 0.0)
+    pv_share = np.divide(pv_remain, total_surplus, out=np.zeros_like(pv_remain), where=has_surplus)
+    wind_share = 1.0 - pv_share
+    charge_pv = charge_power * pv_share
+    charge_wind = charge_power * wind_share
+    charging = charge_power > 0
+    pv_to_storage = np.where(charging, charge_pv * eff, 0.0)
+    wind_to_storage = np.where(charging, charge_wind * eff, 0.0)
+
+    export_power = total_surplus - charge_power
+    exporting = has_surplus & (export_power > 0)
+    pv_export = np.maximum(0.0, np.minimum(pv_remain - charge_pv, np.maximum(0.0, export_power * pv_share)))
+    wind_export = np.maximum(0.0, np.minimum(wind_remain - charge_wind, np.maximum(0.0, export_power * wind_share)))
+    pv_to_grid = np.where(exporting, pv_export, 0.0)
+    wind_to_grid = np.where(exporting, wind_export, 0.0)
+    system_to_grid = np.where(exporting, pv_export + wind_export, 0.0)
+
+    # -------------------- Step 2: Battery vs Grid, driven by the energy trajectory ---
+    discharge_request = np.minimum(remaining, nominal)
+    deficit_peak = is_peak & (remaining > 0) & (discharge_request > 0)
+    dt_h = time_m / 60
+    charge_energy = np.where(charging, charge_power * eff * dt_h, 0.0)
+    discharge_energy = np.where(deficit_peak, discharge_request * dt_h / eff, 0.0)
+
+    if capacity == 0:
+        energy_after = np.zeros(len(load))
+        gate_open = np.zeros(len(load), dtype=bool)
+    else:
+        energy_after, gate_open = _energy_trajectory(battery.energy_stored, capacity, charge_energy,
+                                                     discharge_energy, deficit_peak)
+    if len(load):
+        battery.energy_stored = energy_after[-1]
+
+    storage_to_load = np.where(gate_open, discharge_request, 0.0)
+    residual = remaining - storage_to_load
+    grid_to_load = np.where(residual > 0, residual, 0.0)
+    battery_soc = np.zeros(len(load)) if capacity == 0 else (energy_after / capacity) * 100
+
+    return pd.DataFrame({
+        "Time": time,
+        "pv_to_load": pv_to_load,
+        "wind_to_load": wind_to_load,
+        "storage_to_load": storage_to_load,
+        "grid_to_load": grid_to_load,
+        "system_to_grid": system_to_grid,
+        "pv_to_grid": np.abs(pv_to_grid),
+        "wind_to_grid": np.abs(wind_to_grid),
+        "wind_to_storage": np.abs(wind_to_storage),
+        "pv_to_storage": np.abs(pv_to_storage),
+        "battery_soc": battery_soc,
+        "port": _port_labels(pv_to_load, wind_to_load, storage_to_load, grid_to_load, system_to_grid, is_peak),
+        "pv_to_load_peakhour": np.where(is_peak, pv_to_load, 0.0),
+        "load_demand_peakhour": np.where(is_peak, load, 0.0),
+    })
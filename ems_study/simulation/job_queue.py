@@ -0,0 +1,210 @@
+# simulation/job_queue.py
+import json
+import sqlite3
+import os
+import time
+
+from result_cache import json_default
+
+PENDING, LEASED, DONE, FAILED = "pending", "leased", "done", "failed"
+
+
+class SQLiteJobQueue:
+    def __init__(self, path, lease_seconds=600, max_attempts=3, timeout=60, wal=True):
+        """
+        Job queue for scenario sweeps, stored in one SQLite database.
+
+        A coordinator publishes scenario descriptors, workers claim them one at a time under
+        a lease, and push the resulting metrics back. A job whose lease runs out (worker lost
+        or killed) is handed to the next worker that asks, up to `max_attempts` claims;
+        failed runs are retried the same way. Workers keep long jobs alive with heartbeat().
+
+        Any object with the same publish/claim/heartbeat/complete/fail/counts/results/errors
+        methods and a lease_seconds attribute (workers renew their lease every third of it)
+        can stand in as the backend of distributed.py.
+
+        Args:
+            path (str): SQLite database file. Workers on other machines need it on a shared
+                        filesystem with working file locks (and wal=False on network mounts)
+            lease_seconds (float): How long a claimed job stays assigned without a heartbeat
+            max_attempts (int): Claims per job before it is marked failed
+            timeout (float): Seconds to wait for a lock held by another process
+            wal (bool): Use write-ahead logging (faster, but only safe on a local filesystem)
+        """
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute(f"PRAGMA journal_mode={'WAL' if wal else 'DELETE'}")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " sweep TEXT NOT NULL,"
+                " descriptor TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " worker TEXT,"
+                " lease_expires REAL,"
+                " result TEXT,"
+                " error TEXT,"
+                " updated REAL NOT NULL,"
+                " UNIQUE (sweep, descriptor))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id)")
+        finally:
+            conn.close()
+
+    def _connect(self):
+        # Autocommit mode; writes take an explicit IMMEDIATE lock
+        return sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+
+    def _write(self, statements):
+        """Run `statements(conn)` inside one write transaction and return its result."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            result = statements(conn)
+            conn.execute("COMMIT")
+            return result
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _reap(self, conn, now):
+        """Fail expired leases that used up their attempts (the others are claimable again)."""
+        conn.execute(
+            "UPDATE jobs SET status = ?, error = 'lease expired', updated = ?"
+            " WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+            (FAILED, now, LEASED, now, self.max_attempts),
+        )
+
+    def publish(self, sweep_id, descriptors):
+        """
+        Add one job per scenario descriptor (a JSON-serializable dict) to sweep `sweep_id`.
+
+        Descriptors already published to the sweep are ignored, so a coordinator can safely
+        publish again after a restart.
+
+        Returns:
+            int: Number of new jobs
+        """
+        now = time.time()
+        rows = [(sweep_id, json.dumps(d, sort_keys=True, default=json_default), PENDING, now) for d in descriptors]
+
+        def statements(conn):
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO jobs (sweep, descriptor, status, updated) VALUES (?, ?, ?, ?)", rows)
+            return conn.total_changes - before
+
+        return self._write(statements)
+
+    def claim(self, worker_id, sweep_id=None):
+        """
+        Lease the oldest available job (pending, or leased with an expired lease).
+
+        Returns:
+            dict: id, sweep, descriptor and attempts of the claimed job, or None if there is none
+        """
+        def statements(conn):
+            now = time.time()
+            self._reap(conn, now)
+            query = ("SELECT id, sweep, descriptor, attempts FROM jobs"
+                     " WHERE (status = ? OR (status = ? AND lease_expires < ?))")
+            params = [PENDING, LEASED, now]
+            if sweep_id is not None:
+                query += " AND sweep = ?"
+                params.append(sweep_id)
+            row = conn.execute(query + " ORDER BY id LIMIT 1", params).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, worker = ?, lease_expires = ?, updated = ?"
+                " WHERE id = ?",
+                (LEASED, worker_id, now + self.lease_seconds, now, row[0]),
+            )
+            return {"id": row[0], "sweep": row[1], "descriptor": json.loads(row[2]), "attempts": row[3] + 1}
+
+        return self._write(statements)
+
+    def heartbeat(self, job_id, worker_id):
+        """Extend the lease of a job still held by `worker_id`; False if it was lost."""
+        def statements(conn):
+            now = time.time()
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated = ? WHERE id = ? AND status = ? AND worker = ?",
+                (now + self.lease_seconds, now, job_id, LEASED, worker_id),
+            )
+            return cursor.rowcount == 1
+
+        return self._write(statements)
+
+    def complete(self, job_id, worker_id, metrics):
+        """
+        Store the metrics dict of a job.
+
+        A result arriving after the lease moved to another worker is still accepted (runs
+        are deterministic); only the first result of a job is kept.
+
+        Returns:
+            bool: True if this result was recorded
+        """
+        metrics_json = json.dumps(metrics, default=json_default)
+
+        def statements(conn):
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, worker = ?, result = ?, error = NULL, lease_expires = NULL,"
+                " updated = ? WHERE id = ? AND status != ?",
+                (DONE, worker_id, metrics_json, time.time(), job_id, DONE),
+            )
+            return cursor.rowcount == 1
+
+        return self._write(statements)
+
+    def fail(self, job_id, worker_id, error):
+        """Record a failed run: the job goes back to pending, or to failed after max_attempts."""
+        def statements(conn):
+            cursor = conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END,"
+                " error = ?, lease_expires = NULL, updated = ? WHERE id = ? AND status = ? AND worker = ?",
+                (self.max_attempts, FAILED, PENDING, str(error), time.time(), job_id, LEASED, worker_id),
+            )
+            return cursor.rowcount == 1
+
+        return self._write(statements)
+
+    def counts(self, sweep_id):
+        """Number of jobs of a sweep per status."""
+        def statements(conn):
+            self._reap(conn, time.time())
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs WHERE sweep = ? GROUP BY status", (sweep_id,))
+            counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+            counts.update(dict(rows.fetchall()))
+            return counts
+
+        return self._write(statements)
+
+    def results(self, sweep_id):
+        """Metric dicts of the completed jobs of a sweep, in publication order."""
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT result FROM jobs WHERE sweep = ? AND status = ? ORDER BY id",
+                                (sweep_id, DONE)).fetchall()
+        finally:
+            conn.close()
+        return [json.loads(row[0]) for row in rows]
+
+    def errors(self, sweep_id):
+        """(descriptor, error) of every job of a sweep that ran out of attempts."""
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT descriptor, error FROM jobs WHERE sweep = ? AND status = ? ORDER BY id",
+                                (sweep_id, FAILED)).fetchall()
+        finally:
+            conn.close()
+        return [(json.loads(descriptor), error) for descriptor, error in rows]
@@ -0,0 +1,212 @@
+# simulation/multisite.py
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from ems_study.config import BATTERY_CAPACITY_MWh, BATTERY_NOMINAL_POWER_MW
+from ems_study.simulation.controller import PEAK_HOURS
+
+# Per-site flows, in the same units and meaning as EnergyController.manage_energy
+SITE_FLOWS = [
+    "pv_to_load", "wind_to_load", "storage_to_load", "grid_to_load", "system_to_grid",
+    "pv_to_grid", "wind_to_grid", "wind_to_storage", "pv_to_storage",
+    "shared_to_load", "shared_to_storage", "shared_from_site",
+    "unserved_load", "curtailed", "battery_soc",
+]
+
+
+def _as_site_array(values, n_sites, dtype=np.float64):
+    """Broadcast a scalar or per-site sequence to an array over the site axis."""
+    return np.broadcast_to(np.asarray(values, dtype=dtype), (n_sites,)).copy()
+
+
+class MultiSiteController:
+    def __init__(self, n_sites, capacity=BATTERY_CAPACITY_MWh, nominal_power=BATTERY_NOMINAL_POWER_MW,
+                 efficiency=1, import_limit_MW=None, export_limit_MW=None, share_surplus=True):
+        """
+        Dispatch many sites in lockstep behind one point of common coupling (PCC).
+
+        Every site follows the EnergyController.manage_energy rules, evaluated as array
+        operations over the site axis. On top of the local rules, the surplus a site would
+        export can be routed to other sites: first to their residual load (before their
+        batteries discharge), then to their batteries (within each battery's remaining power
+        this step). The net PCC exchange is capped.
+
+        Args:
+            n_sites (int): Number of sites
+            capacity (float or array): Battery capacity per site in MWh
+            nominal_power (float or array): Battery nominal power per site in MW
+            efficiency (float or array): Battery efficiency per site
+            import_limit_MW (float): Maximum net import at the PCC, None for unlimited
+            export_limit_MW (float): Maximum net export at the PCC, None for unlimited
+            share_surplus (bool): Route exported surplus to other sites' load and batteries first
+        """
+        self.n_sites = n_sites
+        self.capacity = _as_site_array(capacity, n_sites)
+        self.nominal_power = _as_site_array(nominal_power, n_sites)
+        self.efficiency = _as_site_array(efficiency, n_sites)
+        self.energy_stored = self.capacity * 1  # Same full initial SoC as BatterySystem
+        self.import_limit = np.inf if import_limit_MW is None else float(import_limit_MW)
+        self.export_limit = np.inf if export_limit_MW is None else float(export_limit_MW)
+        self.share_surplus = share_surplus
+
+    def get_soc(self):
+        """Return the state of charge of every site as a percentage."""
+        # Same (E / C) * 100 expression as BatterySystem.get_soc
+        return np.divide(self.energy_stored, self.capacity,
+                         out=np.zeros(self.n_sites), where=self.capacity > 0) * 100
+
+    def _step(self, pv, wind, load, is_peak, dt_h, out):
+        cap, nominal, eff = self.capacity, self.nominal_power, self.efficiency
+
+        # -------------------- Step 1: Serve load from PV then Wind -----------------------
+        pv_to_load = np.minimum(pv, load)
+        remaining = load - pv_to_load
+        pv_remain = pv - pv_to_load
+
+        wind_to_load = np.minimum(wind, remaining)
+        remaining = remaining - wind_to_load
+        wind_remain = wind - wind_to_load
+
+        # A site either has residual load or surplus, never both, so its own charge and
+        # discharge are exclusive and the local surplus can be settled first.
+
+        # -------------------- Step 2: Local surplus handling -----------------------------
+        surplus = pv_remain + wind_remain
+        has_surplus = surplus > 0
+        charge = np.where(has_surplus, np.minimum(surplus, nominal), 0.0)
+        pv_share = np.divide(pv_remain, surplus, out=np.zeros(self.n_sites), where=has_surplus)
+        wind_share = 1.0 - pv_share
+        charge_pv = charge * pv_share
+        charge_wind = charge * wind_share
+        charging = charge > 0
+        self.energy_stored = np.where(charging, np.minimum(self.energy_stored + charge * eff * dt_h, cap),
+                                      self.energy_stored)
+
+        export = np.where(has_surplus, surplus - charge, 0.0)
+        pv_export = np.maximum(np.minimum(pv_remain - charge_pv, np.maximum(export * pv_share, 0.0)), 0.0)
+        wind_export = np.maximum(np.minimum(wind_remain - charge_wind, np.maximum(export * wind_share, 0.0)), 0.0)
+        pv_export = np.where(export > 0, pv_export, 0.0)
+        wind_export = np.where(export > 0, wind_export, 0.0)
+
+        # -------------------- Step 3: Shared surplus to other sites' residual load -------
+        shared_to_load = np.zeros(self.n_sites)
+        shared_to_storage = np.zeros(self.n_sites)
+        site_export = pv_export + wind_export
+        pool = site_export.sum()
+        moved = 0.0
+        deficit = np.maximum(remaining, 0.0).sum()
+        if self.share_surplus and pool > 0 and deficit > 0:
+            # Before any battery discharges, so neighbour surplus is not cycled through storage
+            moved = min(pool, deficit)
+            shared_to_load = np.maximum(remaining, 0.0) * (moved / deficit)
+            remaining = remaining - shared_to_load
+
+        # -------------------- Step 4: Battery vs Grid for what is still missing ----------
+        if is_peak:
+            discharge = np.where((remaining > 0) & (self.get_soc() > 20), np.minimum(remaining, nominal), 0.0)
+            discharge = np.maximum(discharge, 0.0)
+            energy_needed = np.divide(discharge * dt_h, eff, out=np.zeros(self.n_sites), where=eff > 0)
+            self.energy_stored = np.where(cap == 0, 0.0, np.maximum(self.energy_stored - energy_needed, 0.0))
+            remaining = remaining - discharge
+        else:
+            discharge = np.zeros(self.n_sites)
+        grid_to_load = np.maximum(remaining, 0.0)
+
+        # -------------------- Step 5: Shared surplus left over to other batteries -------
+        if self.share_surplus and pool > moved:
+            # Within the power left after this step's own charge and discharge
+            energy_room = np.divide(cap - self.energy_stored, eff * dt_h, out=np.zeros(self.n_sites), where=eff > 0)
+            headroom = np.maximum(np.minimum(nominal - charge - discharge, energy_room), 0.0)
+            total_headroom = headroom.sum()
+            if total_headroom > 0:
+                to_storage = min(pool - moved, total_headroom)
+                shared_to_storage = headroom * (to_storage / total_headroom)
+                self.energy_stored = np.minimum(self.energy_stored + shared_to_storage * eff * dt_h, cap)
+                moved += to_storage
+
+        shared_from_site = site_export * (moved / pool) if moved > 0 else np.zeros(self.n_sites)
+        if moved > 0:
+            kept = 1.0 - moved / pool
+            pv_export = pv_export * kept
+            wind_export = wind_export * kept
+
+        # -------------------- Step 6: Shared PCC limits on the net exchange -------------
+        system_to_grid = pv_export + wind_export
+        net_import = grid_to_load.sum() - system_to_grid.sum()
+        unserved = np.zeros(self.n_sites)
+        curtailed = np.zeros(self.n_sites)
+        if net_import > self.import_limit:
+            unserved = grid_to_load * ((net_import - self.import_limit) / grid_to_load.sum())
+            grid_to_load = grid_to_load - unserved
+            net_import = self.import_limit
+        elif -net_import > self.export_limit:
+            cut = (-net_import - self.export_limit) / system_to_grid.sum()
+            curtailed = system_to_grid * cut
+            pv_export = pv_export * (1.0 - cut)
+            wind_export = wind_export * (1.0 - cut)
+            system_to_grid = pv_export + wind_export
+            net_import = -self.export_limit
+
+        out["pv_to_load"] = pv_to_load
+        out["wind_to_load"] = wind_to_load
+        out["storage_to_load"] = discharge
+        out["grid_to_load"] = grid_to_load
+        out["system_to_grid"] = system_to_grid
+        out["pv_to_grid"] = pv_export
+        out["wind_to_grid"] = wind_export
+        out["wind_to_storage"] = charge_wind * eff
+        out["pv_to_storage"] = charge_pv * eff
+        out["shared_to_load"] = shared_to_load
+        out["shared_to_storage"] = shared_to_storage
+        out["shared_from_site"] = shared_from_site
+        out["unserved_load"] = unserved
+        out["curtailed"] = curtailed
+        out["battery_soc"] = self.get_soc()
+        return net_import
+
+    def run_simulation(self, wind_df, load_df, pv_df, time, time_m=15):
+        """
+        Run the dispatch for all sites over the whole horizon.
+
+        Args:
+            wind_df, load_df, pv_df: (time x site) DataFrames or arrays in MW
+            time: Hour of day for every time step (e.g. df.index.hour)
+            time_m (int): Length of a time step in minutes
+
+        Returns:
+            dict: One (time x site) DataFrame per flow in SITE_FLOWS, plus a 'pcc'
+                  DataFrame with the net exchange at the coupling point
+        """
+        wind = np.asarray(wind_df, dtype=np.float64)
+        load = np.asarray(load_df, dtype=np.float64)
+        pv = np.asarray(pv_df, dtype=np.float64)
+        n_steps = load.shape[0]
+        if load.shape != (n_steps, self.n_sites) or wind.shape != load.shape or pv.shape != load.shape:
+            raise ValueError(f"Expected ({n_steps}, {self.n_sites}) arrays for wind, load and PV.")
+
+        is_peak = np.isin(np.asarray(time).astype(int), PEAK_HOURS)
+        dt_h = time_m / 60
+
+        flows = {name: np.empty((n_steps, self.n_sites)) for name in SITE_FLOWS}
+        net_import = np.empty(n_steps)
+        step_out = {}
+        for t in range(n_steps):
+            net_import[t] = self._step(pv[t], wind[t], load[t], is_peak[t], dt_h, step_out)
+            for name in SITE_FLOWS:
+                flows[name][t] = step_out[name]
+
+        index = load_df.index if isinstance(load_df, pd.DataFrame) else None
+        columns = load_df.columns if isinstance(load_df, pd.DataFrame) else None
+        results = {name: pd.DataFrame(values, index=index, columns=columns) for name, values in flows.items()}
+        results["pcc"] = pd.DataFrame({
+            "pcc_import": np.maximum(net_import, 0.0),
+            "pcc_export": np.maximum(-net_import, 0.0),
+            "unserved_load": flows["unserved_load"].sum(axis=1),
+            "curtailed": flows["curtailed"].sum(axis=1),
+        }, index=index)
+        return results
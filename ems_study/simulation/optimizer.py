@@ -2,18 +2,77 @@
 import sys
 import os
 from ems_study.config import BATTERY_CAPACITY_MWh
-from controller import EnergyController
+from controller import EnergyController, CONTROLLER_VERSION
+from checkpoint import block_keys, DEFAULT_SNAPSHOT_INTERVAL
+from event_dispatch import run_event_driven
 
+import numpy as np
 import pandas as pd
 
 class Optimizer:
-    def __init__(self, storage_capacity=BATTERY_CAPACITY_MWh):
+    def __init__(self, storage_capacity=BATTERY_CAPACITY_MWh, checkpoint_store=None,
+                 snapshot_interval=DEFAULT_SNAPSHOT_INTERVAL, event_driven=False):
         self.controller = EnergyController(capacity=storage_capacity)
+        self.event_driven = event_driven  # Jump over spans where the battery regime is fixed
+        self.initial_state = self.controller.get_state()
+        self.checkpoint_store = checkpoint_store  # CheckpointStore enabling incremental re-runs
+        self.snapshot_interval = snapshot_interval
+        self.resumed_from = 0  # First step actually simulated by the last incremental run
 
     def run_simulation(self, wind_df, load_df, pv_df, time):
+        if self.checkpoint_store is not None:
+            return self._run_incremental(wind_df, load_df, pv_df, time)
+        if self.event_driven:
+            return run_event_driven(self.controller, wind_df, load_df, pv_df, time)
         results = []
         time_values = time.to_numpy()  # Convert DatetimeIndex to an array
         for i in range(len(wind_df)):
             result = self.controller.manage_energy(pv_df.iloc[i], wind_df.iloc[i], load_df.iloc[i], time_values[i])
             results.append({**result})
         return pd.DataFrame(results)
+
+    def _run_incremental(self, wind_df, load_df, pv_df, time):
+        """
+        Resume from the latest snapshot whose input prefix is unchanged and splice the
+        newly simulated blocks onto the cached results.
+        """
+        wind = np.asarray(wind_df, dtype=np.float64)
+        load = np.asarray(load_df, dtype=np.float64)
+        pv = np.asarray(pv_df, dtype=np.float64)
+        time_values = np.asarray(time)
+        n_steps = len(wind)
+        battery = self.controller.battery
+        seed = (CONTROLLER_VERSION, battery.capacity, battery.nominal_power, battery.efficiency,
+                sorted(self.initial_state.items()), self.snapshot_interval)
+        keys = block_keys([wind, load, pv, time_values.astype(np.int64)], n_steps, self.snapshot_interval, seed)
+
+        # Walk the cached prefix up to the first changed block
+        frames = []
+        state = self.initial_state
+        for key in keys:
+            entry = self.checkpoint_store.get(key)
+            if entry is None:
+                break
+            frames.append(entry["results"])
+            state = entry["state"]
+        self.controller.set_state(state)
+        self.resumed_from = min(len(frames) * self.snapshot_interval, n_steps)
+
+        for block, key in enumerate(keys[len(frames):], start=len(frames)):
+            start = block * self.snapshot_interval
+            stop = min(start + self.snapshot_interval, n_steps)
+            if self.event_driven:
+                block_results = run_event_driven(self.controller, wind[start:stop], load[start:stop],
+                                                 pv[start:stop], time_values[start:stop])
+            else:
+                results = []
+                for i in range(start, stop):
+                    result = self.controller.manage_energy(pv[i], wind[i], load[i], time_values[i])
+                    results.append({**result})
+                block_results = pd.DataFrame(results)
+            self.checkpoint_store.put(key, self.controller.get_state(), block_results)
+            frames.append(block_results)
+
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
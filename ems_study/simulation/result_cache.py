@@ -0,0 +1,151 @@
+# simulation/result_cache.py
+import hashlib
+import json
+import pickle
+import sqlite3
+import sys
+import os
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from ems_study import config
+
+
+def json_default(value):
+    """json.dumps fallback for numpy scalars and anything else that is not plain JSON."""
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """SHA-256 of a file's bytes."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def frame_digest(df):
+    """SHA-256 of a DataFrame's index and values."""
+    hashed = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    h = hashlib.sha256(hashed.tobytes())
+    h.update(repr(list(df.columns)).encode())
+    return h.hexdigest()
+
+
+def config_constants():
+    """All constants defined in ems_study.config (e.g. BATTERY_CAPACITY_MWh, TURBINE_TYPE)."""
+    return {name: value for name, value in vars(config).items()
+            if name[:1].isupper() and isinstance(value, (int, float, str, bool))}
+
+
+def scenario_key(**parts):
+    """Content address of a scenario: hash of every input that can change its result."""
+    payload = json.dumps(parts, sort_keys=True, default=json_default)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, path, max_entries=None, max_bytes=None, timeout=60):
+        """
+        Persistent cache of scenario metrics (and optionally time series), shared by processes.
+
+        Entries are stored in one SQLite database, so concurrent workers can read and write
+        it safely. Least recently used entries are evicted beyond `max_entries` or `max_bytes`.
+
+        Args:
+            path (str): SQLite database file
+            max_entries (int): Maximum number of cached scenarios, None for unlimited
+            max_bytes (int): Maximum total payload size in bytes, None for unlimited
+            timeout (float): Seconds to wait for a lock held by another process
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY,"
+                " metrics TEXT NOT NULL,"
+                " series BLOB,"
+                " size INTEGER NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+        finally:
+            conn.close()
+
+    def _connect(self):
+        # Autocommit mode; writes take an explicit IMMEDIATE lock
+        return sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+
+    def get(self, key, with_series=False):
+        """
+        Return the cached metrics dict for `key` (or (metrics, series) when with_series=True),
+        or None on a miss.
+        """
+        conn = self._connect()
+        try:
+            column = "metrics, series" if with_series else "metrics, NULL"
+            row = conn.execute(f"SELECT {column} FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE results SET last_access = ? WHERE key = ?", (time.time(), key))
+        finally:
+            conn.close()
+
+        metrics = json.loads(row[0])
+        if not with_series:
+            return metrics
+        series = pickle.loads(row[1]) if row[1] is not None else None
+        return metrics, series
+
+    def put(self, key, metrics, series=None):
+        """Store the metrics dict (and optional results DataFrame) of one scenario."""
+        metrics_json = json.dumps(metrics, default=json_default)
+        series_blob = pickle.dumps(series, protocol=pickle.HIGHEST_PROTOCOL) if series is not None else None
+        size = len(metrics_json) + (len(series_blob) if series_blob is not None else 0)
+
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, metrics, series, size, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, metrics_json, series_blob, size, time.time()),
+            )
+            self._evict(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _evict(self, conn):
+        """Drop least recently used entries until both limits hold (inside the write lock)."""
+        if self.max_entries is None and self.max_bytes is None:
+            return
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM results ORDER BY last_access ASC"):
+            over_entries = self.max_entries is not None and count > self.max_entries
+            over_bytes = self.max_bytes is not None and total > self.max_bytes
+            if not (over_entries or over_bytes):
+                break
+            victims.append((key,))
+            count -= 1
+            total -= size
+        conn.executemany("DELETE FROM results WHERE key = ?", victims)
+
+    def __len__(self):
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        finally:
+            conn.close()
@@ -0,0 +1,201 @@
+# simulation/scenario.py
+import sys
+import os
+from contextlib import contextmanager
+from pprint import pprint
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from ems_study import config
+from ems_study.models.wind_farm import load_wind_weather, WindFarmEngine
+from ems_study.models.windPowerForcat import windPowerOutput
+from ems_study.models.pv_orientation import PVOrientationEngine, load_pv_weather, default_location
+from ems_study.models.pv import pvPowerOutput
+from ems_study.simulation.alignment import InputAligner
+from optimizer import Optimizer
+from controller import EnergyController, CONTROLLER_VERSION
+from result_cache import ResultCache, scenario_key, file_digest, frame_digest, config_constants
+from sweep import battery_depleted
+
+EnergyController = EnergyController()
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data'))
+RESULTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'results'))
+OUTPUT_PATH = r"/Users/MAC/Documents/ems-project/results/outputTest888.csv"
+
+# Scenario metrics are cached across runs; set CACHE_TIME_SERIES to also keep the dispatch results
+result_cache = ResultCache(os.path.join(RESULTS_DIR, "scenario_cache.sqlite"), max_entries=5000)
+CACHE_TIME_SERIES = False
+
+# Config constants a scenario may override: the only ones read at run time. The other
+# modules bind their constants at import and PV is computed once per process, so overriding
+# anything else would change the cache key without changing the result.
+OVERRIDABLE_CONSTANTS = ("TURBINE_TYPE", "BATTERY_NOMINAL_POWER_MW")
+
+# Inputs loaded once per process and shared by every scenario it runs
+_INPUTS = {}
+
+
+def input_digest():
+    """Fingerprint of the data a scenario depends on (wind and PV are computed from the weather files)."""
+    load = pd.read_csv(os.path.join(DATA_DIR, "annual_power_input.csv"), encoding="utf-8-sig")
+    load.columns = load.columns.str.strip()
+    return {
+        "weather": file_digest(os.path.join(DATA_DIR, "weather.csv")),
+        "weather_pv": file_digest(os.path.join(DATA_DIR, "weather_pv.csv")),
+        "load": frame_digest(load[["Time", "Load"]]),
+    }
+
+
+INPUT_DIGEST = input_digest()
+
+
+def load_inputs():
+    """Load and PV series, the wind engine and the weather -> load index aligner (cached)."""
+    if not _INPUTS:
+        df = pd.read_csv(os.path.join(DATA_DIR, "annual_power_input.csv"), sep=",", encoding="utf-8-sig")
+        df.columns = df.columns.str.strip()
+
+        if "Time" not in df.columns:
+            raise ValueError(f"Missing 'Time' column. Found columns: {df.columns.tolist()}")
+
+        df["Time"] = pd.to_datetime(df["Time"], utc=True)
+        df.set_index("Time", inplace=True)
+
+        if "Load" not in df.columns:
+            raise ValueError("Missing columns: {'Load'}")
+
+        aligner = InputAligner(df.index)
+
+        # PV plant output on the load index, W -> MW (the same for every scenario)
+        pv_engine = PVOrientationEngine(load_pv_weather(os.path.join(DATA_DIR, "weather_pv.csv")), default_location())
+        pv_power = pvPowerOutput(pv_engine)
+
+        _INPUTS["load_pv"] = pd.DataFrame({
+            "Load": df["Load"],
+            "PV": aligner.align(pv_power, method='linear', source_tz='UTC', scale=1e-6).values,
+        }, index=df.index)
+        _INPUTS["wind_engine"] = WindFarmEngine(load_wind_weather(os.path.join(DATA_DIR, "weather.csv")))
+        _INPUTS["aligner"] = aligner
+    return _INPUTS
+
+
+def check_overrides(overrides):
+    """Raise ValueError if `overrides` names a constant outside OVERRIDABLE_CONSTANTS."""
+    unsupported = sorted(set(overrides or {}) - set(OVERRIDABLE_CONSTANTS))
+    if unsupported:
+        raise ValueError(f"Config constants {unsupported} cannot be overridden per scenario. "
+                         f"Supported: {list(OVERRIDABLE_CONSTANTS)}")
+
+
+@contextmanager
+def config_overrides(overrides=None):
+    """Temporarily replace ems_study.config constants, e.g. {"BATTERY_NOMINAL_POWER_MW": 20}."""
+    check_overrides(overrides)
+    saved = {}
+    try:
+        for name, value in (overrides or {}).items():
+            saved[name] = getattr(config, name)
+            setattr(config, name, value)
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(config, name, value)
+
+
+def run_simulation(num_wind_turbines, storage_capacity_mwh, overrides=None, output_path=OUTPUT_PATH):
+    """
+    Simulate one sizing scenario and return its metrics.
+
+    Args:
+        num_wind_turbines (int): Turbine count of the wind farm
+        storage_capacity_mwh (float): Battery capacity in MWh
+        overrides (dict): ems_study.config constants to replace for this scenario,
+                          limited to OVERRIDABLE_CONSTANTS
+        output_path (str): CSV file receiving the dispatch results, None to skip writing it.
+                           A cached scenario is only simulated again to write this file when
+                           its time series is not cached (CACHE_TIME_SERIES)
+    """
+    with config_overrides(overrides):
+        key = scenario_key(
+            inputs=INPUT_DIGEST,
+            config=config_constants(),
+            controller_version=CONTROLLER_VERSION,
+            num_wind_turbines=num_wind_turbines,
+            storage_capacity_mwh=storage_capacity_mwh,
+        )
+        cached = result_cache.get(key, with_series=output_path is not None)
+        if cached is not None and output_path is not None:
+            cached, series = cached
+            if series is None:
+                cached = None  # Only the metrics are cached; simulate again to write the CSV
+            else:
+                series.to_csv(output_path, index=False)
+        if cached is not None:
+            pprint(cached)
+            return cached
+
+        inputs = load_inputs()
+        df = inputs["load_pv"].copy()
+
+        # Wind farm output on the load index, W -> MW (kept in memory so concurrent scenarios don't share a file)
+        wind_power = windPowerOutput(inputs["wind_engine"], num_wind_turbines, config.TURBINE_TYPE)
+        df["wind"] = inputs["aligner"].align(wind_power, method='linear', scale=1e-6).values
+
+        optimizer = Optimizer(storage_capacity=storage_capacity_mwh, event_driven=True)
+        optimizer.controller.battery.nominal_power = config.BATTERY_NOMINAL_POWER_MW
+        results = optimizer.run_simulation(df["wind"], df["Load"], df["PV"], df.index.hour)
+
+    # Add additional data
+    results['Load'] = df['Load'].values
+    results['PV'] = df['PV'].values
+    results['wind'] = df['wind'].values
+
+    penetration_pv = (np.sum(results['pv_to_load']) / np.sum(df["Load"])) * 100
+    penetration_storage = (np.sum(results['storage_to_load']) / np.sum(df["Load"])) * 100
+    penetration_wind = (np.sum(results['wind_to_load']) / np.sum(df["Load"])) * 100
+    sum_load_peackhour = np.sum(df["Load"][df.index.hour.map(EnergyController.peackHour)])
+
+    total_storage_energy_production = np.sum(results['storage_to_load']) / 4
+    total_wind_energy_production = np.sum(
+        results['wind_to_load'] + results['wind_to_grid'] + results['wind_to_storage']) / 4
+
+    sum_pv_to_load_peakhour = np.sum(results["pv_to_load"][results["Time"].map(EnergyController.peackHour)])
+    sum_storage_to_load_peakhour = np.sum(results["storage_to_load"][results["Time"].map(EnergyController.peackHour)])
+    sum_wind_to_load_peakhour = np.sum(results["wind_to_load"][results["Time"].map(EnergyController.peackHour)])
+
+    penetration_pv_peakhour = sum_pv_to_load_peakhour / sum_load_peackhour * 100
+    penetration_storage_peakhour = sum_storage_to_load_peakhour / sum_load_peackhour * 100
+    penetration_wind_peakhour = sum_wind_to_load_peakhour / sum_load_peackhour * 100
+    total_penetration_peakhour = penetration_wind_peakhour + penetration_pv_peakhour + penetration_storage_peakhour
+
+    total_renewable_penetration = penetration_pv + penetration_storage + penetration_wind
+    total_energy_delivered_to_grid = np.sum(results['system_to_grid']) / 4
+    total_energy_purchased_from_grid = np.sum(results['grid_to_load']) / 4
+
+    # Save results
+    if output_path is not None:
+        results.to_csv(output_path, index=False)
+    series = results if CACHE_TIME_SERIES else None
+    depleted = battery_depleted(results, storage_capacity_mwh)
+
+    results = {
+        "num_wind_turbines": num_wind_turbines,
+        "storage_capacity_mwh": storage_capacity_mwh,
+        "total_renewable_penetration": total_renewable_penetration,
+        "total_wind_energy_production": total_wind_energy_production,
+        "total_storage_energy_production": total_storage_energy_production,
+        "total_energy_delivered_to_grid": total_energy_delivered_to_grid,
+        "total_energy_purchased_from_grid": total_energy_purchased_from_grid,
+        "penetration_pv_peakhour": penetration_pv_peakhour,
+        "penetration_storage_peakhour": penetration_storage_peakhour,
+        "penetration_wind_peakhour": penetration_wind_peakhour,
+        "total_penetration_peakhour": total_penetration_peakhour,
+        "battery_depleted": depleted,
+    }
+    result_cache.put(key, results, series=series)
+    pprint(results)
+    return results
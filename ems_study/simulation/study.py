@@ -5,87 +5,11 @@ import sys
 import os
 import matplotlib.pyplot as plt
 import seaborn as sns
-from pprint import pprint
-from optimizer import Optimizer
-from ems_study.models.windPowerForcat import windPowerForecast
-from controller import EnergyController
+from scenario import run_simulation
+from sweep import SweepRunner
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-# Adjust sys.path only if necessary
-EnergyController = EnergyController()
-
-
-def run_simulation(num_wind_turbines, storage_capacity_mwh):
-    # Forecast annual wind power production
-    annual_power_wind_production = windPowerForecast(turbine_count=num_wind_turbines)
-
-    # Load dataset
-    file_path = r"/Users/MAC/energy_management_system_simulation/ems_study/data/annual_power_input.csv"
-    df = pd.read_csv(file_path, sep=",", encoding="utf-8-sig")
-    df.columns = df.columns.str.strip()
-
-    if "Time" not in df.columns:
-        raise ValueError(f"Missing 'Time' column. Found columns: {df.columns.tolist()}")
-
-    df["Time"] = pd.to_datetime(df["Time"])
-    df.set_index("Time", inplace=True)
-
-    required_columns = {"PV", "wind", "Load"}
-    if not required_columns.issubset(df.columns):
-        raise ValueError(f"Missing columns: {required_columns - set(df.columns)}")
-
-    df["wind"] = df["wind"] / 1e6  # Convert wind power to MW if needed
-
-    optimizer = Optimizer(storage_capacity=storage_capacity_mwh)
-    results = optimizer.run_simulation(df["wind"], df["Load"], df["PV"], df.index.hour)
-
-    # Add additional data
-    results['Load'] = df['Load'].values
-    results['PV'] = df['PV'].values
-    results['wind'] = df['wind'].values
-
-    penetration_pv = (np.sum(results['pv_to_load']) / np.sum(df["Load"])) * 100
-    penetration_storage = (np.sum(results['storage_to_load']) / np.sum(df["Load"])) * 100
-    penetration_wind = (np.sum(results['wind_to_load']) / np.sum(df["Load"])) * 100
-    sum_load_peackhour = np.sum(df["Load"][df.index.hour.map(EnergyController.peackHour)])
-
-    total_storage_energy_production = np.sum(results['storage_to_load']) / 4
-    total_wind_energy_production = np.sum(
-        results['wind_to_load'] + results['wind_to_grid'] + results['wind_to_storage']) / 4
-
-    sum_pv_to_load_peakhour = np.sum(results["pv_to_load"][results["Time"].map(EnergyController.peackHour)])
-    sum_storage_to_load_peakhour = np.sum(results["storage_to_load"][results["Time"].map(EnergyController.peackHour)])
-    sum_wind_to_load_peakhour = np.sum(results["wind_to_load"][results["Time"].map(EnergyController.peackHour)])
-
-    penetration_pv_peakhour = sum_pv_to_load_peakhour / sum_load_peackhour * 100
-    penetration_storage_peakhour = sum_storage_to_load_peakhour / sum_load_peackhour * 100
-    penetration_wind_peakhour = sum_wind_to_load_peakhour / sum_load_peackhour * 100
-    total_penetration_peakhour = penetration_wind_peakhour + penetration_pv_peakhour + penetration_storage_peakhour
-
-    total_renewable_penetration = penetration_pv + penetration_storage + penetration_wind
-    total_energy_delivered_to_grid = np.sum(results['system_to_grid']) / 4
-    total_energy_purchased_from_grid = np.sum(results['grid_to_load']) / 4
-
-    # Save results
-    results.to_csv(r"/Users/MAC/Documents/ems-project/results/outputTest888.csv", index=False)
-
-    results = {
-        "num_wind_turbines": num_wind_turbines,
-        "storage_capacity_mwh": storage_capacity_mwh,
-        "total_renewable_penetration": total_renewable_penetration,
-        "total_wind_energy_production": total_wind_energy_production,
-        "total_storage_energy_production": total_storage_energy_production,
-        "total_energy_delivered_to_grid": total_energy_delivered_to_grid,
-        "total_energy_purchased_from_grid": total_energy_purchased_from_grid,
-        "penetration_pv_peakhour": penetration_pv_peakhour,
-        "penetration_storage_peakhour": penetration_storage_peakhour,
-        "penetration_wind_peakhour": penetration_wind_peakhour,
-        "total_penetration_peakhour": total_penetration_peakhour,
-    }
-    pprint(results)
-    return results
-
 
 # Candidate selection process
 n_wind_candidates = [i for i in range(0, 81, 20)]
@@ -94,12 +18,15 @@ candidates = []
 allData = []
 min_penetration_threshold = 70
 
-for wind in n_wind_candidates:
-    for batt in battery_candidates:
-        metrics = run_simulation(num_wind_turbines=wind, storage_capacity_mwh=batt)
-        allData.append(metrics)
-        if metrics["total_renewable_penetration"] >= min_penetration_threshold:
-            candidates.append(metrics)
+# Points bounded below the threshold, or repeating a larger battery's result, are not simulated;
+# bounded points come back as skipped records (no penetration) and stay out of the plots
+sweep = SweepRunner(run_simulation, n_wind_candidates, battery_candidates, threshold=min_penetration_threshold)
+for metrics in sweep.run():
+    allData.append(metrics)
+    if metrics["total_renewable_penetration"] is not None and \
+            metrics["total_renewable_penetration"] >= min_penetration_threshold:
+        candidates.append(metrics)
+print(sweep.report())
 
 if not candidates:
     raise RuntimeError("No viable candidate found.")
@@ -147,6 +74,9 @@ df_all_data = pd.DataFrame(allData)
 
 df_all_data.to_csv(r"/Users/MAC/energy_management_system_simulation/ems_study/results/optimisation_result_v2.csv", index=False)
 
+# Only points with a known penetration are plotted
+df_known = df_all_data[df_all_data["total_renewable_penetration"].notna()]
+
 print(df_candidates.head(5))
 
 # Scatter plot: Wind turbines vs Battery capacity vs Penetration
@@ -158,7 +88,7 @@ sns.scatterplot(
     hue="total_renewable_penetration",
     palette="viridis",
     sizes=(50, 400),
-    data=df_all_data,
+    data=df_known,
     legend="brief"
 )
 
@@ -180,9 +110,9 @@ from mpl_toolkits.mplot3d import Axes3D
 from scipy.interpolate import griddata
 
 # Create grid for interpolation
-x = df_all_data['num_wind_turbines']
-y = df_all_data['storage_capacity_mwh']
-z = df_all_data['total_renewable_penetration']
+x = df_known['num_wind_turbines']
+y = df_known['storage_capacity_mwh']
+z = df_known['total_renewable_penetration']
 
 xi = np.linspace(x.min(), x.max(), 100)
 yi = np.linspace(y.min(), y.max(), 100)
@@ -0,0 +1,141 @@
+# simulation/sweep.py
+import sys
+import os
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from ems_study.simulation.controller import PEAK_HOURS
+
+PENETRATION = "total_renewable_penetration"
+
+
+def battery_depleted(results, capacity):
+    """
+    True if the battery ever hit its discharge limit (SoC <= 20% on a peak deficit, or empty).
+
+    If it never did, a larger battery runs the exact same dispatch shifted by a constant
+    energy offset: the upper clamp keeps the offset and the 20% gate never closes, so every
+    flow and metric is unchanged. The sweep uses this to skip larger capacities.
+    """
+    soc = results["battery_soc"].to_numpy(dtype=np.float64)
+    initial_soc = 100.0 if capacity > 0 else 0.0
+    soc_before = np.concatenate(([initial_soc], soc[:-1]))
+    discharging = results["storage_to_load"].to_numpy() > 0
+    deficit = discharging | (results["grid_to_load"].to_numpy() > 0)
+    is_peak = np.isin(results["Time"].to_numpy().astype(int), PEAK_HOURS)
+
+    gated = is_peak & deficit & (soc_before <= 20)
+    emptied = discharging & (soc <= 0)
+    return bool(np.any(gated | emptied))
+
+
+class SweepRunner:
+    def __init__(self, simulate, wind_candidates, battery_candidates, threshold=None, prune_below_best=False):
+        """
+        Sizing sweep over (turbine count x battery capacity) that skips provably redundant points.
+
+        The threshold and best rules assume that renewable penetration does not decrease
+        with more turbines or more storage. This is expected but not proven: the 20%
+        discharge gate can make a larger system dispatch differently. Under that
+        assumption, the largest capacity of a turbine row bounds every point of that row
+        and of all rows with fewer turbines. Pruning rules:
+          - threshold: rows whose upper bound is below `threshold` are skipped
+          - saturation: once a capacity leaves the battery undepleted, larger capacities
+            reuse its metrics (exact, no assumption needed, see battery_depleted)
+          - best: with prune_below_best, rows whose upper bound is below the best
+            penetration found so far are skipped (only the optimum and its ties are kept)
+
+        Skipped points are still returned, as records with total_renewable_penetration=None,
+        their penetration_upper_bound and the rule that skipped them in `skipped`.
+
+        Args:
+            simulate (callable): simulate(num_wind_turbines, storage_capacity_mwh) -> metrics dict
+            wind_candidates (list): Turbine counts
+            battery_candidates (list): Battery capacities in MWh
+            threshold (float): Minimum renewable penetration in %, None to keep every row
+            prune_below_best (bool): Only look for the highest penetration
+        """
+        self.simulate = simulate
+        self.wind_candidates = sorted(wind_candidates)
+        self.battery_candidates = sorted(battery_candidates)
+        self.threshold = threshold
+        self.prune_below_best = prune_below_best
+        self.stats = {}
+
+    def _evaluate(self, wind, capacity, evaluated):
+        if (wind, capacity) not in evaluated:
+            evaluated[(wind, capacity)] = self.simulate(num_wind_turbines=wind, storage_capacity_mwh=capacity)
+            self.stats["simulated"] += 1
+        return evaluated[(wind, capacity)]
+
+    def _skip(self, known, wind, bound, rule):
+        """Add a skipped record for every unknown point with at most `wind` turbines."""
+        skipped = 0
+        for w in self.wind_candidates:
+            for capacity in self.battery_candidates:
+                if w <= wind and (w, capacity) not in known:
+                    known[(w, capacity)] = {
+                        "num_wind_turbines": w,
+                        "storage_capacity_mwh": capacity,
+                        PENETRATION: None,
+                        "penetration_upper_bound": bound,
+                        "skipped": rule,
+                    }
+                    skipped += 1
+        return skipped
+
+    def run(self):
+        """
+        Run the sweep.
+
+        Returns:
+            list: One dict per grid point in (turbines, capacity) order: the metrics of
+                  simulated or reused points, and a skipped record for the others
+        """
+        n_points = len(self.wind_candidates) * len(self.battery_candidates)
+        self.stats = {"grid_points": n_points, "simulated": 0, "reused_by_saturation": 0,
+                      "skipped_by_threshold": 0, "skipped_by_best": 0}
+        evaluated = {}
+        known = {}
+        best = -np.inf
+        max_capacity = self.battery_candidates[-1]
+
+        # Most turbines first: each row's largest capacity bounds every smaller row
+        for wind in reversed(self.wind_candidates):
+            row_bound = self._evaluate(wind, max_capacity, evaluated)[PENETRATION]
+
+            if self.threshold is not None and row_bound < self.threshold:
+                # Every remaining point has fewer turbines and no more storage
+                known[(wind, max_capacity)] = evaluated[(wind, max_capacity)]
+                self.stats["skipped_by_threshold"] += self._skip(known, wind, row_bound, "threshold")
+                break
+
+            if self.prune_below_best and row_bound < best:
+                # This row and every smaller one cannot even tie the best point found
+                known[(wind, max_capacity)] = evaluated[(wind, max_capacity)]
+                self.stats["skipped_by_best"] += self._skip(known, wind, row_bound, "best")
+                break
+
+            reused = None
+            for capacity in self.battery_candidates:
+                if reused is not None:
+                    metrics = dict(reused, storage_capacity_mwh=capacity)
+                    if (wind, capacity) not in evaluated:
+                        self.stats["reused_by_saturation"] += 1
+                else:
+                    metrics = self._evaluate(wind, capacity, evaluated)
+                    if not metrics.get("battery_depleted", True):
+                        reused = metrics
+                known[(wind, capacity)] = metrics
+                best = max(best, metrics[PENETRATION])
+
+        self.stats["avoided"] = n_points - self.stats["simulated"]
+        return [known[point] for point in sorted(known)]
+
+    def report(self):
+        s = self.stats
+        return (f"Sweep: {s['simulated']}/{s['grid_points']} points simulated, {s['avoided']} avoided "
+                f"({s['reused_by_saturation']} by battery saturation, {s['skipped_by_threshold']} by threshold, "
+                f"{s['skipped_by_best']} by best bound)")
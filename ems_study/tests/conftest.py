@@ -0,0 +1,7 @@
+# tests/conftest.py
+import sys
+import os
+
+# Same import roots as the scripts: the project root and the simulation directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'simulation')))
@@ -0,0 +1,105 @@
+# tests/test_alignment.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from ems_study.simulation.alignment import InputAligner, YEAR_NS, _PLAN_CACHE, _build_plan, _positions
+
+HOUR_NS = 3600 * 10**9
+DAY_NS = 24 * HOUR_NS
+
+
+@pytest.fixture(autouse=True)
+def empty_plan_cache():
+    _PLAN_CACHE.clear()
+
+
+def hourly(year, tz="UTC"):
+    index = pd.date_range(f"{year}-01-01", f"{year + 1}-01-01", freq="h", tz=tz, inclusive="left")
+    return pd.Series(np.random.default_rng(year).uniform(0, 100, len(index)), index=index)
+
+
+def quarter_hourly(year):
+    return pd.date_range(f"{year}-01-01", f"{year + 1}-01-01", freq="15min", tz="UTC", inclusive="left")
+
+
+def periodic_reference(source, target_index):
+    """np.interp over the calendar-year positions, with the profile repeating every YEAR_NS."""
+    source_pos = _positions(source.index.tz_convert("UTC").as_unit("ns"), True)
+    inside = source_pos < YEAR_NS
+    target_pos = _positions(target_index.as_unit("ns"), True)
+    return np.interp(target_pos, source_pos[inside], source.to_numpy()[inside], period=YEAR_NS)
+
+
+def test_plus_one_hour_source_lines_up_by_instant():
+    # Weather file stamped in +01:00: 01:00+01:00 is the same instant as 00:00 UTC
+    source = hourly(2025, tz="Etc/GMT-1")
+    aligned = InputAligner(quarter_hourly(2025)).align(source)
+    assert aligned.iloc[0] == source.iloc[1]
+    assert aligned.iloc[1] == pytest.approx(source.iloc[1] * 0.75 + source.iloc[2] * 0.25)
+    np.testing.assert_allclose(aligned.to_numpy(), periodic_reference(source, aligned.index), rtol=1e-12)
+
+
+def test_year_shift_maps_by_position_in_the_year():
+    source = hourly(2023)
+    aligned = InputAligner(quarter_hourly(2025)).align(source)
+    assert aligned[pd.Timestamp("2025-06-01 06:00", tz="UTC")] == source[pd.Timestamp("2023-06-01 06:00", tz="UTC")]
+    np.testing.assert_allclose(aligned.to_numpy(), periodic_reference(source, aligned.index), rtol=1e-12)
+
+
+def test_absolute_time_without_year_shift_holds_the_edges():
+    source = hourly(2023)
+    target = pd.date_range("2023-12-31 22:00", periods=16, freq="15min", tz="UTC")
+    aligned = InputAligner(target).align(source, year_shift=False)
+    assert aligned.iloc[0] == source.iloc[-2]
+    assert (aligned.iloc[4:] == source.iloc[-1]).all()
+
+
+def test_step_holds_and_linear_interpolates():
+    source = hourly(2023)
+    aligner = InputAligner(quarter_hourly(2023))
+    step = aligner.align(source, method="step").to_numpy().reshape(-1, 4)
+    linear = aligner.align(source, method="linear").to_numpy().reshape(-1, 4)
+    values = source.to_numpy()
+
+    assert (step == values[:, None]).all()
+    np.testing.assert_allclose(linear[:-1, 2], (values[:-1] + values[1:]) / 2, rtol=1e-12)
+    np.testing.assert_allclose(linear[-1, 2], (values[-1] + values[0]) / 2, rtol=1e-12)  # wraps to Jan 1
+
+
+def test_scale_converts_units():
+    source = hourly(2023)
+    aligner = InputAligner(quarter_hourly(2025))
+    np.testing.assert_allclose(aligner.align(source, scale=1e-6).to_numpy(), aligner.align(source).to_numpy() * 1e-6)
+
+
+def test_leap_target_shifts_from_feb_29_and_wraps_dec_31():
+    source = hourly(2023)
+    aligned = InputAligner(quarter_hourly(2024)).align(source)
+    assert aligned[pd.Timestamp("2024-02-29 12:00", tz="UTC")] == source[pd.Timestamp("2023-03-01 12:00", tz="UTC")]
+    assert aligned[pd.Timestamp("2024-12-30 12:00", tz="UTC")] == source[pd.Timestamp("2023-12-31 12:00", tz="UTC")]
+    assert aligned[pd.Timestamp("2024-12-31 12:00", tz="UTC")] == source[pd.Timestamp("2023-01-01 12:00", tz="UTC")]
+    np.testing.assert_allclose(aligned.to_numpy(), periodic_reference(source, aligned.index), rtol=1e-12)
+
+
+def test_leap_source_drops_dec_31_and_stays_sorted():
+    source = hourly(2024)
+    aligned = InputAligner(quarter_hourly(2025)).align(source)
+    np.testing.assert_allclose(aligned.to_numpy(), periodic_reference(source, aligned.index), rtol=1e-12)
+
+    # Every target sits between its two bracketing samples on the wrapped profile
+    source_pos = _positions(source.index.as_unit("ns"), True)
+    target_pos = _positions(aligned.index.as_unit("ns"), True) % YEAR_NS
+    lo, hi, weight = _build_plan(source_pos, target_pos, YEAR_NS)
+    assert (source_pos[lo] < YEAR_NS).all() and (source_pos[hi] < YEAR_NS).all()
+    gap = (source_pos[hi] - source_pos[lo]) % YEAR_NS
+    assert (gap <= HOUR_NS).all() and (gap > 0).all()
+    assert ((target_pos - source_pos[lo]) % YEAR_NS <= gap).all()
+    assert ((weight >= 0) & (weight <= 1)).all()
+
+
+def test_plans_are_cached_per_index_pair():
+    source = hourly(2023)
+    aligner = InputAligner(quarter_hourly(2025))
+    plan = aligner.plan(source.index)
+    assert InputAligner(quarter_hourly(2025)).plan(source.index) is plan
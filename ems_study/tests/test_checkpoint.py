@@ -0,0 +1,91 @@
+# tests/test_checkpoint.py
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ems_study.simulation.checkpoint import CheckpointStore
+from ems_study.simulation.optimizer import Optimizer
+
+INTERVAL = 96
+CAPACITY = 40
+
+
+def random_inputs(rng, n_steps):
+    """Random wind/load/PV Series (MW) and the hour of day as an Index, like main.py passes them."""
+    regime = np.repeat(rng.uniform(0, 2, n_steps // 48 + 1), 48)[:n_steps]
+    wind = pd.Series(rng.uniform(0, 30, n_steps) * regime)
+    load = pd.Series(rng.uniform(0, 25, n_steps))
+    pv = pd.Series(np.where(rng.random(n_steps) < 0.5, 0.0, rng.uniform(0, 10, n_steps)))
+    hours = pd.Index((np.arange(n_steps) // 4) % 24)
+    return wind, load, pv, hours
+
+
+def extend(inputs, rng, n_extra):
+    wind, load, pv, hours = inputs
+    more_wind, more_load, more_pv, _ = random_inputs(rng, n_extra)
+    more_hours = pd.Index((np.arange(len(hours), len(hours) + n_extra) // 4) % 24)
+    return (pd.concat([wind, more_wind], ignore_index=True), pd.concat([load, more_load], ignore_index=True),
+            pd.concat([pv, more_pv], ignore_index=True), hours.append(more_hours))
+
+
+@pytest.mark.parametrize("on_disk", [False, True])
+def test_edited_tail_resumes_and_matches_a_fresh_run(tmp_path, on_disk):
+    rng = np.random.default_rng(7)
+    inputs = random_inputs(rng, 2000)
+    store = CheckpointStore(str(tmp_path / "snapshots") if on_disk else None)
+
+    first = Optimizer(CAPACITY, checkpoint_store=store, snapshot_interval=INTERVAL)
+    pd.testing.assert_frame_equal(first.run_simulation(*inputs), Optimizer(CAPACITY).run_simulation(*inputs),
+                                  check_exact=True)
+    assert first.resumed_from == 0
+
+    # Edit the load tail and extend the horizon
+    wind, load, pv, hours = extend(inputs, rng, 300)
+    load = load.copy()
+    load.iloc[1500:1510] += 5
+    edited = (wind, load, pv, hours)
+
+    second = Optimizer(CAPACITY, checkpoint_store=store, snapshot_interval=INTERVAL)
+    result = second.run_simulation(*edited)
+    assert second.resumed_from == 1500 // INTERVAL * INTERVAL
+    pd.testing.assert_frame_equal(result, Optimizer(CAPACITY).run_simulation(*edited), check_exact=True)
+
+    # Unchanged inputs replay entirely from snapshots
+    third = Optimizer(CAPACITY, checkpoint_store=store, snapshot_interval=INTERVAL)
+    pd.testing.assert_frame_equal(third.run_simulation(*edited), result, check_exact=True)
+    assert third.resumed_from == len(load)
+
+
+def test_unloadable_snapshots_are_misses(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    store.put("good", {"energy_stored": 1.0}, pd.DataFrame({"a": [1.0]}))
+    assert store.get("good")["state"] == {"energy_stored": 1.0}
+
+    corrupt = {
+        "truncated": b"\x80\x05",
+        "garbage": b"not a pickle",
+        "missing_module": b"cno_such_module\nThing\n.",
+        "missing_class": b"cems_study.config\nNoSuchThing\n.",
+    }
+    for key, payload in corrupt.items():
+        with open(os.path.join(str(tmp_path), f"{key}.pkl"), "wb") as f:
+            f.write(payload)
+        assert store.get(key) is None, key
+    assert store.get("absent") is None
+
+
+@pytest.mark.parametrize("on_disk", [False, True])
+def test_least_recently_used_snapshots_are_evicted(tmp_path, on_disk):
+    store = CheckpointStore(str(tmp_path) if on_disk else None, max_entries=2)
+    store.put("a", {}, pd.DataFrame())
+    store.put("b", {}, pd.DataFrame())
+    if on_disk:
+        os.utime(os.path.join(str(tmp_path), "a.pkl"), (0, 0))
+        os.utime(os.path.join(str(tmp_path), "b.pkl"), (1, 1))
+    assert store.get("a") is not None  # "b" is now the least recently used
+    store.put("c", {}, pd.DataFrame())
+
+    assert store.get("b") is None
+    assert store.get("a") is not None and store.get("c") is not None
@@ -0,0 +1,38 @@
+# tests/test_event_dispatch.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from ems_study.simulation.controller import EnergyController
+from ems_study.simulation.event_dispatch import run_event_driven
+
+
+def random_trace(rng, n_steps):
+    """Random wind/load/PV (MW) and hour of day, with long calm and windy spells."""
+    regime = np.repeat(rng.uniform(0, 2, n_steps // 48 + 1), 48)[:n_steps]
+    wind = rng.uniform(0, 30, n_steps) * regime
+    load = rng.uniform(0, 25, n_steps)
+    pv = np.where(rng.random(n_steps) < 0.5, 0.0, rng.uniform(0, 10, n_steps))
+    hours = (np.arange(n_steps) // 4 + rng.integers(24)) % 24
+    return wind, load, pv, hours
+
+
+def step_by_step(controller, wind, load, pv, hours):
+    return pd.DataFrame([controller.manage_energy(pv[i], wind[i], load[i], hours[i]) for i in range(len(load))])
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_event_driven_matches_manage_energy(seed):
+    rng = np.random.default_rng(seed)
+    wind, load, pv, hours = random_trace(rng, int(rng.integers(1, 800)))
+    capacity = float(rng.choice([0, rng.uniform(0, 200)]))
+    initial_energy = rng.uniform(0, capacity)
+
+    reference, candidate = EnergyController(capacity=capacity), EnergyController(capacity=capacity)
+    reference.battery.energy_stored = candidate.battery.energy_stored = initial_energy
+
+    expected = step_by_step(reference, wind, load, pv, hours)
+    result = run_event_driven(candidate, wind, load, pv, hours)
+
+    pd.testing.assert_frame_equal(result, expected, check_exact=True, check_dtype=False)
+    assert candidate.battery.energy_stored == reference.battery.energy_stored
@@ -0,0 +1,98 @@
+# tests/test_job_queue.py
+import time
+
+import pytest
+
+from ems_study.simulation.job_queue import SQLiteJobQueue
+
+LEASE = 0.2
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return SQLiteJobQueue(str(tmp_path / "jobs.sqlite"), lease_seconds=LEASE, max_attempts=2)
+
+
+def descriptors(n):
+    return [{"num_wind_turbines": i, "storage_capacity_mwh": 10, "overrides": {}} for i in range(n)]
+
+
+def test_publish_is_idempotent(queue):
+    assert queue.publish("s", descriptors(3)) == 3
+    assert queue.publish("s", descriptors(4)) == 1
+    assert queue.publish("other", descriptors(1)) == 1
+    assert queue.counts("s") == {"pending": 4, "leased": 0, "done": 0, "failed": 0}
+
+
+def test_claims_are_exclusive_until_the_lease_expires(queue):
+    queue.publish("s", descriptors(1))
+    job = queue.claim("a")
+    assert job["descriptor"]["num_wind_turbines"] == 0 and job["attempts"] == 1
+    assert queue.claim("b") is None
+
+    time.sleep(LEASE * 1.5)
+    retried = queue.claim("b")
+    assert retried["id"] == job["id"] and retried["attempts"] == 2
+    assert not queue.heartbeat(job["id"], "a")  # the lost worker notices it no longer holds the job
+    assert queue.heartbeat(job["id"], "b")
+
+
+def test_heartbeat_keeps_the_lease(queue):
+    queue.publish("s", descriptors(1))
+    job = queue.claim("a")
+    for _ in range(3):
+        time.sleep(LEASE / 2)
+        assert queue.heartbeat(job["id"], "a")
+    assert queue.claim("b") is None
+
+
+def test_first_result_wins(queue):
+    queue.publish("s", descriptors(1))
+    job = queue.claim("a")
+    time.sleep(LEASE * 1.5)
+    queue.claim("b")
+
+    assert queue.complete(job["id"], "a", {"value": 1})  # late result of the lost worker is still accepted
+    assert not queue.complete(job["id"], "b", {"value": 2})
+    assert queue.results("s") == [{"value": 1}]
+
+
+def test_failures_are_retried_up_to_max_attempts(queue):
+    queue.publish("s", descriptors(1))
+    job = queue.claim("a")
+    assert queue.fail(job["id"], "a", "boom")
+    assert queue.counts("s")["pending"] == 1
+
+    job = queue.claim("b")
+    assert queue.fail(job["id"], "b", "boom again")
+    assert queue.claim("c") is None
+    assert queue.counts("s")["failed"] == 1
+    assert queue.errors("s") == [(descriptors(1)[0], "boom again")]
+
+
+def test_expired_leases_run_out_of_attempts(queue):
+    queue.publish("s", descriptors(1))
+    queue.claim("a")
+    time.sleep(LEASE * 1.5)
+    queue.claim("b")
+    time.sleep(LEASE * 1.5)
+    assert queue.claim("c") is None
+    assert queue.counts("s") == {"pending": 0, "leased": 0, "done": 0, "failed": 1}
+
+
+def test_worker_drains_the_sweep(queue):
+    from ems_study.simulation.distributed import publish_sweep, run_worker, wait_for_sweep
+
+    publish_sweep(queue, "s", [0, 1, 2], [0, 50])
+
+    def simulate(num_wind_turbines, storage_capacity_mwh, overrides):
+        if num_wind_turbines == 1 and storage_capacity_mwh == 50:
+            raise RuntimeError("boom")
+        return {"num_wind_turbines": num_wind_turbines, "storage_capacity_mwh": storage_capacity_mwh}
+
+    assert run_worker(queue, simulate=simulate, poll_interval=0.01, idle_timeout=0.05) == 5
+    results = wait_for_sweep(queue, "s", poll_interval=0.01, timeout=1)
+    assert [(r["num_wind_turbines"], r["storage_capacity_mwh"]) for r in results] == \
+        [(0, 0), (0, 50), (1, 0), (2, 0), (2, 50)]
+    [(descriptor, error)] = queue.errors("s")
+    assert descriptor["num_wind_turbines"] == 1 and "boom" in error
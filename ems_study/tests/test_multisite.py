@@ -0,0 +1,82 @@
+# tests/test_multisite.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from ems_study.simulation.controller import EnergyController
+from ems_study.simulation.multisite import MultiSiteController
+
+N_SITES = 4
+FLOWS = ["pv_to_load", "wind_to_load", "storage_to_load", "grid_to_load", "system_to_grid",
+         "pv_to_grid", "wind_to_grid", "wind_to_storage", "pv_to_storage", "battery_soc"]
+
+
+def random_sites(rng, n_steps, n_sites=N_SITES):
+    """Random (time x site) wind/load/PV in MW and hour of day for every step."""
+    regime = np.repeat(rng.uniform(0, 2, (n_steps // 48 + 1, n_sites)), 48, axis=0)[:n_steps]
+    wind = rng.uniform(0, 30, (n_steps, n_sites)) * regime
+    load = rng.uniform(0, 25, (n_steps, n_sites))
+    pv = np.where(rng.random((n_steps, n_sites)) < 0.5, 0.0, rng.uniform(0, 10, (n_steps, n_sites)))
+    hours = (np.arange(n_steps) // 4 + rng.integers(24)) % 24
+    return wind, load, pv, hours
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_sites_match_manage_energy_without_sharing(seed):
+    rng = np.random.default_rng(seed)
+    wind, load, pv, hours = random_sites(rng, 400)
+    capacities = np.array([0.0, *rng.uniform(0, 200, N_SITES - 1)])
+    initial_energy = rng.uniform(0, capacities)
+
+    controller = MultiSiteController(N_SITES, capacity=capacities, share_surplus=False)
+    controller.energy_stored = initial_energy.copy()
+    results = controller.run_simulation(wind, load, pv, hours)
+
+    for site in range(N_SITES):
+        reference = EnergyController(capacity=capacities[site])
+        reference.battery.energy_stored = initial_energy[site]
+        expected = pd.DataFrame([reference.manage_energy(pv[i, site], wind[i, site], load[i, site], hours[i])
+                                 for i in range(len(hours))])
+        for flow in FLOWS:
+            np.testing.assert_array_equal(results[flow][site].to_numpy(), expected[flow].to_numpy(), err_msg=flow)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_energy_balance(seed):
+    rng = np.random.default_rng(seed)
+    wind, load, pv, hours = random_sites(rng, 400)
+    controller = MultiSiteController(N_SITES, capacity=rng.uniform(0, 100, N_SITES), efficiency=0.9,
+                                     import_limit_MW=40, export_limit_MW=20)
+    controller.energy_stored = controller.capacity * rng.uniform(0, 1, N_SITES)
+    results = controller.run_simulation(wind, load, pv, hours)
+    r = {name: frame.to_numpy() for name, frame in results.items() if name != "pcc"}
+
+    served = r["pv_to_load"] + r["wind_to_load"] + r["storage_to_load"] + r["grid_to_load"] \
+        + r["shared_to_load"] + r["unserved_load"]
+    np.testing.assert_allclose(served, load, atol=1e-9)
+
+    charged = (r["pv_to_storage"] + r["wind_to_storage"]) / 0.9
+    generated = r["pv_to_load"] + r["wind_to_load"] + charged + r["shared_from_site"] + r["system_to_grid"] \
+        + r["curtailed"]
+    np.testing.assert_allclose(generated, pv + wind, atol=1e-9)
+    np.testing.assert_allclose(r["shared_from_site"].sum(axis=1),
+                               (r["shared_to_load"] + r["shared_to_storage"]).sum(axis=1), atol=1e-9)
+
+    pcc = results["pcc"]
+    net = r["grid_to_load"].sum(axis=1) - r["system_to_grid"].sum(axis=1)
+    np.testing.assert_allclose(pcc["pcc_import"] - pcc["pcc_export"], net, atol=1e-9)
+    assert (pcc["pcc_import"] <= 40 + 1e-9).all() and (pcc["pcc_export"] <= 20 + 1e-9).all()
+
+
+def test_neighbour_surplus_serves_load_before_the_battery():
+    # Peak hour: site 0 has 10 MW of load and no generation, site 1 has 30 MW of wind
+    controller = MultiSiteController(2, efficiency=0.9)
+    results = controller.run_simulation(np.array([[0.0, 30.0]]), np.array([[10.0, 0.0]]),
+                                        np.zeros((1, 2)), [19])
+    step = {name: frame.to_numpy()[0] for name, frame in results.items()}
+
+    assert step["shared_to_load"][0] == 10
+    assert step["storage_to_load"][0] == 0 and step["grid_to_load"][0] == 0
+    assert step["battery_soc"][0] == 100
+    assert step["shared_from_site"][1] == 10 and step["system_to_grid"][1] == pytest.approx(5)
+    assert results["pcc"]["pcc_export"].iloc[0] == pytest.approx(5)
@@ -0,0 +1,35 @@
+# tests/test_scenario.py
+import pandas as pd
+import pytest
+
+from ems_study.simulation import scenario
+from ems_study.simulation.result_cache import ResultCache
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path / "cache.sqlite"))
+    monkeypatch.setattr(scenario, "result_cache", cache)
+    return cache
+
+
+@pytest.mark.parametrize("cache_series", [False, True])
+def test_cache_hit_still_writes_the_output(tmp_path, cache, monkeypatch, cache_series):
+    monkeypatch.setattr(scenario, "CACHE_TIME_SERIES", cache_series)
+    output = tmp_path / "output.csv"
+    metrics = scenario.run_simulation(10, 20, output_path=str(output))
+    expected = pd.read_csv(output)
+
+    output.unlink()
+    if cache_series:
+        # Served from the cached time series, without simulating
+        monkeypatch.setattr(scenario, "load_inputs", lambda: pytest.fail("simulated a cached scenario"))
+    assert scenario.run_simulation(10, 20, output_path=str(output)) == metrics
+    pd.testing.assert_frame_equal(pd.read_csv(output), expected)
+
+
+def test_cache_hit_without_output_skips_the_simulation(cache, monkeypatch):
+    metrics = scenario.run_simulation(10, 20, output_path=None)
+    monkeypatch.setattr(scenario, "load_inputs", lambda: pytest.fail("simulated a cached scenario"))
+    assert scenario.run_simulation(10, 20, output_path=None) == metrics
+    assert len(cache) == 1
@@ -0,0 +1,77 @@
+# tests/test_sweep.py
+import numpy as np
+import pandas as pd
+
+from ems_study.simulation.controller import EnergyController
+from ems_study.simulation.sweep import SweepRunner, battery_depleted, PENETRATION
+
+CAPACITIES = [0, 10, 30, 60, 120, 250, 500]
+FLOWS = ["pv_to_load", "wind_to_load", "storage_to_load", "grid_to_load", "system_to_grid",
+         "pv_to_grid", "wind_to_grid", "wind_to_storage", "pv_to_storage", "port"]
+
+
+def random_trace(seed, n_steps=600):
+    rng = np.random.default_rng(seed)
+    wind = rng.uniform(0, 30, n_steps) * np.repeat(rng.uniform(0, 2, n_steps // 48 + 1), 48)[:n_steps]
+    load = rng.uniform(0, 20, n_steps)
+    pv = np.where(rng.random(n_steps) < 0.5, 0.0, rng.uniform(0, 10, n_steps))
+    hours = (np.arange(n_steps) // 4) % 24
+    return wind, load, pv, hours
+
+
+def dispatch(capacity, wind, load, pv, hours):
+    controller = EnergyController(capacity=capacity)
+    return pd.DataFrame([controller.manage_energy(pv[i], wind[i], load[i], hours[i]) for i in range(len(load))])
+
+
+def test_undepleted_battery_saturates():
+    # A capacity that never hits its discharge limit gives the same flows as every larger one
+    undepleted = 0
+    for seed in range(12):
+        trace = random_trace(seed)
+        results = {capacity: dispatch(capacity, *trace) for capacity in CAPACITIES}
+        for i, capacity in enumerate(CAPACITIES):
+            if battery_depleted(results[capacity], capacity):
+                continue
+            undepleted += 1
+            for larger in CAPACITIES[i + 1:]:
+                pd.testing.assert_frame_equal(results[larger][FLOWS], results[capacity][FLOWS], check_exact=True)
+    assert undepleted > 0
+
+
+def test_sweep_matches_full_grid():
+    trace = random_trace(3)
+    wind_counts = [0, 1, 2, 3]
+
+    def simulate(num_wind_turbines, storage_capacity_mwh):
+        wind, load, pv, hours = trace
+        results = dispatch(storage_capacity_mwh, wind * num_wind_turbines / 2, load, pv, hours)
+        return {
+            "num_wind_turbines": num_wind_turbines,
+            "storage_capacity_mwh": storage_capacity_mwh,
+            PENETRATION: (results["pv_to_load"].sum() + results["wind_to_load"].sum()
+                          + results["storage_to_load"].sum()) / load.sum() * 100,
+            "battery_depleted": battery_depleted(results, storage_capacity_mwh),
+        }
+
+    sweep = SweepRunner(simulate, wind_counts, CAPACITIES)
+    records = sweep.run()
+    assert sweep.stats["reused_by_saturation"] > 0
+    assert len(records) == len(wind_counts) * len(CAPACITIES)
+    for record in records:
+        expected = simulate(record["num_wind_turbines"], record["storage_capacity_mwh"])
+        assert record[PENETRATION] == expected[PENETRATION]
+
+
+def test_skipped_points_are_reported():
+    def simulate(num_wind_turbines, storage_capacity_mwh):
+        return {"num_wind_turbines": num_wind_turbines, "storage_capacity_mwh": storage_capacity_mwh,
+                PENETRATION: num_wind_turbines + storage_capacity_mwh / 100, "battery_depleted": True}
+
+    sweep = SweepRunner(simulate, [0, 20, 40, 60], [0, 50, 100], threshold=45)
+    records = sweep.run()
+    skipped = [r for r in records if r.get("skipped") == "threshold"]
+
+    assert len(records) == 12
+    assert len(skipped) == sweep.stats["skipped_by_threshold"] == 8
+    assert all(r[PENETRATION] is None and r["penetration_upper_bound"] == 41 for r in skipped)